@@ -0,0 +1,582 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark.py : Mesures de rendiment dels camins crítics de la biblioteca.
+
+Ús: python Benchmark.py [dijkstra|playlists|reload_fs|memoria|importtime|arrencada|suite] [--sizes 1000 10000 100000]
+
+La suite genera biblioteques sintètiques (sense MP4 reals: tinytag se
+substitueix per un generador de tags) i mesura tots els camins crítics per a
+cada mida, amb el pic de memòria; --json desa els resultats i --compara
+mostra la ràtio contra un JSON d'un altre commit.
+"""
+import argparse
+import contextlib
+import itertools
+import json
+import math
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+from collections import Counter
+from ElementData import ElementData
+from GrafHash import GrafHash
+
+
+def graf_aleatori(n_vertexs, grau=8, llavor=0):
+    """ Genera un GrafHash dirigit amb n_vertexs i ~grau arestes de sortida per vèrtex. """
+    rnd = random.Random(llavor)
+    graf = GrafHash(digraf=True)
+    claus = [f"v{i}" for i in range(n_vertexs)]
+    for clau in claus:
+        graf.insert_vertex(clau, ElementData(filename=clau))
+    for clau in claus:
+        for _ in range(grau):
+            graf.insert_edge(clau, rnd.choice(claus), rnd.randint(1, 10))
+    return graf, claus
+
+
+def bench_dijkstra(sizes, grau=8, repeticions=5):
+    """ Temps mitjà de dijkstra/camiMesCurt normalitzat per (V+E) log V. """
+    resultats = []
+    for n in sizes:
+        graf, claus = graf_aleatori(n, grau)
+        rnd = random.Random(1)
+        origens = [rnd.choice(claus) for _ in range(repeticions)]
+        destins = [rnd.choice(claus) for _ in range(repeticions)]
+
+        t0 = time.perf_counter()
+        for origen in origens:
+            graf.dijkstra(origen)
+        t_dijkstra = (time.perf_counter() - t0) / repeticions
+
+        t0 = time.perf_counter()
+        for origen, desti in zip(origens, destins):
+            graf.camiMesCurt(origen, desti)
+        t_cami = (time.perf_counter() - t0) / repeticions
+
+        arestes = n * grau
+        cota = (n + arestes) * math.log2(n)
+        resultats.append({
+            "V": n,
+            "E": arestes,
+            "dijkstra_s": t_dijkstra,
+            "camiMesCurt_s": t_cami,
+            "ns_per_unitat": t_dijkstra / cota * 1e9,
+        })
+    return resultats
+
+
+def playlists_aleatories(claus, n_llistes, llargada=50, llavor=0, sessions=None):
+    """
+    Llistes de reproducció sintètiques (llistes d'uuids sense repetits).
+    Amb sessions=k es reprodueixen k sessions diferents, com passa en
+    repetir historials d'escolta reals on les transicions es repeteixen.
+    """
+    rnd = random.Random(llavor)
+    diferents = n_llistes if sessions is None else sessions
+    base = [rnd.sample(claus, min(llargada, len(claus))) for _ in range(diferents)]
+    if sessions is None:
+        return base
+    return [rnd.choice(base) for _ in range(n_llistes)]
+
+
+def bench_playlists(n_vertexs=10000, n_llistes=20000, llargada=50, sessions=500):
+    """ Transicions/segon: camí antic parell a parell contra add_edge_weights. """
+    _, claus = graf_aleatori(n_vertexs, grau=0)
+    llistes = playlists_aleatories(claus, n_llistes, llargada, sessions=sessions)
+    transicions = sum(len(llista) - 1 for llista in llistes)
+    existents = set(claus)
+
+    graf, _ = graf_aleatori(n_vertexs, grau=0)
+    t0 = time.perf_counter()
+    for llista in llistes:
+        videos = [uuid for uuid in llista if uuid in existents]
+        for uuid1, uuid2 in zip(videos, videos[1:]):
+            if graf.existeix_arestes(uuid1, uuid2):
+                graf.update_edge_weight(uuid1, uuid2, graf.get_weight(uuid1, uuid2) + 1)
+            else:
+                graf.insert_edge(uuid1, uuid2, 1)
+    t_antic = time.perf_counter() - t0
+
+    graf, _ = graf_aleatori(n_vertexs, grau=0)
+    t0 = time.perf_counter()
+    buffer = Counter()
+    for llista in llistes:
+        videos = [uuid for uuid in llista if uuid in existents]
+        buffer.update(zip(videos, videos[1:]))
+    graf.add_edge_weights(buffer)
+    t_lot = time.perf_counter() - t0
+
+    return [{
+        "transicions": transicions,
+        "antic_tps": transicions / t_antic,
+        "lot_tps": transicions / t_lot,
+    }]
+
+
+def arbre_aleatori(arrel, n_fitxers, per_directori=1000):
+    """ Crea n_fitxers .mp4 buits repartits en subdirectoris de per_directori fitxers. """
+    fitxers = []
+    for i in range(n_fitxers):
+        directori = os.path.join(arrel, f"g{i // (per_directori * 100)}", f"d{i // per_directori}")
+        if i % per_directori == 0:
+            os.makedirs(directori, exist_ok=True)
+        fitxer = os.path.join(directori, f"v{i}.mp4")
+        open(fitxer, "w").close()
+        fitxers.append(fitxer)
+    return fitxers
+
+
+def bench_reload_fs(n_fitxers=100000, canvi=0.01, workers=8):
+    """ Temps del primer escaneig i del re-escaneig amb un canvi del `canvi`·N de fitxers. """
+    from VideoFiles import VideoFiles
+    rnd = random.Random(0)
+    arrel = tempfile.mkdtemp(prefix="bench_videofiles_")
+    try:
+        fitxers = arbre_aleatori(arrel, n_fitxers)
+        # Com una biblioteca real: els directoris no s'han tocat des de fa estona
+        # (si no, VideoFiles no reaprofita cap llistat dins de GRANULARITAT_NS)
+        fa_una_hora = time.time() - 3600
+        for directori, _, _ in os.walk(arrel):
+            os.utime(directori, (fa_una_hora, fa_una_hora))
+        video_files = VideoFiles()
+        t0 = time.perf_counter()
+        video_files.reload_fs(arrel, workers=workers)
+        t_inicial = time.perf_counter() - t0
+
+        # Meitat altes, meitat baixes, concentrades en pocs directoris com en una pujada real
+        n_canvis = int(n_fitxers * canvi)
+        for fitxer in rnd.sample(fitxers[:n_fitxers // 10], n_canvis // 2):
+            os.remove(fitxer)
+        for i in range(n_canvis - n_canvis // 2):
+            open(os.path.join(os.path.dirname(fitxers[i]), f"nou{i}.mp4"), "w").close()
+        t0 = time.perf_counter()
+        video_files.reload_fs(arrel, workers=workers)
+        t_reescaneig = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        video_files.reload_fs(arrel, workers=workers)
+        t_sense_canvis = time.perf_counter() - t0
+        return [{
+            "fitxers": n_fitxers,
+            "inicial_s": t_inicial,
+            "reescaneig_s": t_reescaneig,
+            "sense_canvis_s": t_sense_canvis,
+            "afegits": len(video_files.files_added()),
+        }]
+    finally:
+        shutil.rmtree(arrel, ignore_errors=True)
+
+
+def tags_sintetics(n, llavor=0):
+    """ [durada, títol, àlbum, artista, compositor, gènere, any, comentari] amb valors repetits com en una biblioteca real. """
+    rnd = random.Random(llavor)
+    artistes = [f"Artista {i}" for i in range(max(n // 50, 1))]
+    generes = ["rock", "pop", "jazz", "clàssica", "electrònica", "hip hop"]
+    return [[rnd.randint(5, 600), f"Títol {i}", f"Àlbum {rnd.randrange(max(n // 10, 1))}",
+             rnd.choice(artistes), rnd.choice(artistes), rnd.choice(generes),
+             str(rnd.randint(1960, 2024)), ""] for i in range(n)]
+
+
+def bench_memoria_metadata(n=100000):
+    """ Memòria retinguda (tracemalloc) per la metadata: dict de llistes + ElementData contra MetadataStore. """
+    from MetadataStore import MetadataStore
+    base = tags_sintetics(n)
+    uuids = [f"{i:032x}" for i in range(n)]
+    noms = [f"d{i % 100}/video_{i}.mp4" for i in range(n)]
+    rutes = [f"/videos/{nom}" for nom in noms]
+
+    def llegits():
+        # Còpies noves de cada cadena, com les que retorna tinytag per a cada fitxer
+        for valors in base:
+            yield [v if isinstance(v, int) else "".join(list(v)) for v in valors]
+
+    tracemalloc.start()
+    abans = tracemalloc.take_snapshot()
+    metadata = {}
+    elements = {}
+    for uuid, nom, ruta, valors in zip(uuids, noms, rutes, llegits()):
+        metadata[uuid] = [nom, ruta] + valors
+        elements[uuid] = ElementData(filename=nom)
+    bytes_llistes = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(abans, "filename"))
+    del metadata, elements
+
+    abans = tracemalloc.take_snapshot()
+    store = MetadataStore()
+    elements = {}
+    for uuid, nom, ruta, valors in zip(uuids, noms, rutes, llegits()):
+        store.add(uuid, nom, ruta)
+        store.set_tags(uuid, valors)
+        elements[uuid] = store.element(uuid)
+    bytes_columnar = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(abans, "filename"))
+    tracemalloc.stop()
+    return [{
+        "videos": n,
+        "llistes_bytes_per_video": bytes_llistes / n,
+        "columnar_bytes_per_video": bytes_columnar / n,
+    }]
+
+
+DEPENDENCIES_PESANTS = ("vlc", "tinytag", "numpy")
+
+
+def bench_importtime(moduls=None, repeticions=3):
+    """
+    Temps d'importació en fred de cada mòdul del projecte amb
+    `python -X importtime`, en un procés nou per mòdul (el millor de
+    repeticions), i quines dependències pesants arrossega.
+    """
+    directori = os.path.dirname(os.path.abspath(__file__))
+    if moduls is None:
+        moduls = sorted(nom[:-3] for nom in os.listdir(directori)
+                        if nom.endswith(".py") and nom != os.path.basename(__file__))
+    resultats = []
+    for modul in moduls:
+        millor, importats, error = None, set(), None
+        for _ in range(repeticions):
+            proces = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {modul}"],
+                                    cwd=directori, capture_output=True, text=True)
+            if proces.returncode != 0:
+                error = proces.stderr.strip().splitlines()[-1]
+                break
+            # Línies "import time: self [us] | cumulative | imported package"
+            for linia in proces.stderr.splitlines():
+                if not linia.startswith("import time:") or "cumulative" in linia:
+                    continue
+                _, acumulat, nom = linia[len("import time:"):].split("|")
+                nom = nom.strip()
+                importats.add(nom.split(".")[0])
+                if nom == modul:
+                    acumulat = int(acumulat) / 1000
+                    millor = acumulat if millor is None else min(millor, acumulat)
+        resultats.append({
+            "modul": modul,
+            "ms": millor,
+            "pesants": [dep for dep in DEPENDENCIES_PESANTS if dep in importats],
+            "error": error,
+        })
+    return resultats
+
+
+def bench_arrencada(n=20, open_delay=0.02):
+    """
+    Latència d'arrencada per element (open + play) de cada motor, amb i
+    sense preparar el següent element mentre sona l'actual. Sense libvlc
+    només es mesura StubBackend, amb open_delay com a cost simulat d'obrir.
+    """
+    from PlayerBackend import StubBackend, VlcBackend, VlcListBackend
+    motors = [("stub", lambda: StubBackend(open_delay=open_delay))]
+    for nom, classe in (("vlc", VlcBackend), ("vlc_list", VlcListBackend)):
+        try:
+            classe().close()
+        except Exception as e:  # sense el mòdul vlc o sense libvlc
+            print(f"{nom}: no disponible ({e})")
+            continue
+        motors.append((nom, classe))
+    arrel = tempfile.mkdtemp(prefix="bench_arrencada_")
+    try:
+        paths = []
+        for i in range(n):
+            paths.append(os.path.join(arrel, f"video_{i}.mp4"))
+            open(paths[-1], "wb").close()
+        resultats = []
+        for nom, crea in motors:
+            for prepara in (False, True):
+                motor = crea()
+                latencies = []
+                seguent = None  # handle del següent, obert mentre sona l'actual
+                for i, path in enumerate(paths):
+                    t0 = time.perf_counter()
+                    handle = seguent if seguent is not None else motor.open(path)
+                    seguent = None
+                    motor.play(handle)
+                    latencies.append(time.perf_counter() - t0)
+                    if prepara and i + 1 < n:
+                        seguent = motor.open(paths[i + 1])
+                    motor.stop(handle)
+                motor.close()
+                latencies.sort()
+                resultats.append({
+                    "motor": nom,
+                    "prepara_seguent": prepara,
+                    "mediana_ms": latencies[n // 2] * 1000,
+                    "maxim_ms": latencies[-1] * 1000,
+                })
+        return resultats
+    finally:
+        shutil.rmtree(arrel, ignore_errors=True)
+
+
+class TinyTagSintetic:
+    """ Substitut de tinytag.TinyTag: tags deterministes a partir del nom del fitxer. """
+    GENERES = ("rock", "pop", "jazz", "clàssica", "electrònica", "hip hop")
+
+    def __init__(self, path):
+        rnd = random.Random(path)
+        self.duration = rnd.uniform(5, 600)
+        self.title = f"Títol {os.path.basename(path)}"
+        self.album = f"Àlbum {rnd.randrange(1000)}"
+        self.artist = f"Artista {rnd.randrange(2000)}"
+        self.composer = f"Artista {rnd.randrange(2000)}"
+        self.genre = rnd.choice(self.GENERES)
+        self.year = str(rnd.randint(1960, 2024))
+        self.comment = ""
+
+    @classmethod
+    def get(cls, path):
+        return cls(path)
+
+
+@contextlib.contextmanager
+def tinytag_sintetic():
+    """ Instal·la TinyTagSintetic com a mòdul tinytag mentre dura el bloc. """
+    anterior = sys.modules.get("tinytag")
+    modul = types.ModuleType("tinytag")
+    modul.TinyTag = TinyTagSintetic
+    sys.modules["tinytag"] = modul
+    try:
+        yield
+    finally:
+        if anterior is None:
+            del sys.modules["tinytag"]
+        else:
+            sys.modules["tinytag"] = anterior
+
+
+def llargades(n_llistes, mitjana, distribucio, rnd):
+    """ Llargades de les llistes: fixa, uniforme (2..2·mitjana-2) o geomètrica (mínim 2). """
+    if distribucio == "fixa":
+        return [mitjana] * n_llistes
+    if distribucio == "uniforme":
+        return [rnd.randint(2, max(2, 2 * mitjana - 2)) for _ in range(n_llistes)]
+    return [2 + int(rnd.expovariate(1 / max(mitjana - 2, 1))) for _ in range(n_llistes)]
+
+
+def biblioteca_sintetica(n_videos, n_llistes, llargada=20, distribucio="geometrica", llavor=0):
+    """
+    VideoID + VideoData amb n_videos vídeos amb tags i n_llistes llistes de
+    reproducció. La popularitat segueix una llei de Zipf, com en un historial
+    real on uns quants vídeos concentren les reproduccions.
+    """
+    from VideoID import VideoID
+    from VideoData import VideoData
+    rnd = random.Random(llavor)
+    fitxers = [f"g{i // 1000}/video_{i}.mp4" for i in range(n_videos)]
+    video_id = VideoID()
+    video_data = VideoData()
+    uuids = video_id.generate_uuids(fitxers)
+    video_data.add_videos(zip(uuids, fitxers))
+    with tinytag_sintetic():
+        video_data.load_metadata_bulk(uuids)
+    acumulat = list(itertools.accumulate(1 / (i + 1) for i in range(n_videos)))
+    llistes = [list(dict.fromkeys(rnd.choices(uuids, cum_weights=acumulat, k=k)))
+               for k in llargades(n_llistes, llargada, distribucio, rnd)]
+    video_data.read_playlists(llistes)
+    return video_id, video_data, fitxers, uuids, llistes
+
+
+def cronometra(funcio, arguments):
+    """ Temps mitjà per crida de funcio(*a) per a cada a d'arguments. """
+    arguments = list(arguments)
+    t0 = time.perf_counter()
+    for a in arguments:
+        funcio(*a)
+    return (time.perf_counter() - t0) / max(len(arguments), 1)
+
+
+def bench_suite(sizes, n_llistes=None, llargada=20, distribucio="geometrica", mostra=200,
+                max_fitxers=20000, llavor=0):
+    """
+    Per a cada mida N retorna {"videos": N, "temps": {operació: s/crida},
+    "pic_memoria_bytes": ...}. Les operacions per element es mesuren sobre
+    una mostra de `mostra` crides; les de lot, per element processat.
+    """
+    from PlayList import PlayList
+    from SearchMetadata import SearchMetadata
+    from VideoFiles import VideoFiles
+    from VideoPlayer import VideoPlayer
+    resultats = []
+    for n in sizes:
+        llistes_n = n_llistes if n_llistes is not None else max(n // 10, 10)
+        rnd = random.Random(llavor)
+        temps = {}
+
+        tracemalloc.start()
+        biblioteca_sintetica(n, llistes_n, llargada, distribucio, llavor)
+        pic = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        t0 = time.perf_counter()
+        video_id, video_data, fitxers, uuids, llistes = biblioteca_sintetica(n, llistes_n, llargada, distribucio, llavor)
+        temps["biblioteca_total"] = time.perf_counter() - t0
+
+        # VideoID
+        nous = [f"nou/video_{i}.mp4" for i in range(mostra)]
+        temps["VideoID.generate_uuid"] = cronometra(video_id.generate_uuid, ((f,) for f in nous))
+        temps["VideoID.get_uuid"] = cronometra(video_id.get_uuid, ((f,) for f in rnd.sample(fitxers, min(mostra, n))))
+        temps["VideoID.generate_uuids_per_video"] = cronometra(
+            video_id.generate_uuids, [([f"lot/video_{i}.mp4" for i in range(n)],)]) / n
+
+        # VideoData
+        temps["VideoData.add_video"] = cronometra(video_data.add_video,
+                                                  ((video_id.get_uuid(f), f) for f in nous))
+        with tinytag_sintetic():
+            temps["VideoData.load_metadata"] = cronometra(video_data.load_metadata,
+                                                          ((video_id.get_uuid(f),) for f in nous))
+        transicions = sum(len(llista) - 1 for llista in llistes[:mostra])
+        temps["VideoData.read_playlist_per_transicio"] = cronometra(
+            video_data.read_playlist, ((llista,) for llista in llistes[:mostra])) * min(mostra, len(llistes)) / max(transicions, 1)
+        parells = [(rnd.choice(uuids), rnd.choice(uuids)) for _ in range(min(mostra, 20))]
+        temps["VideoData.get_video_distance"] = cronometra(video_data.get_video_distance, parells)
+
+        # GrafHash, amb les mateixes transicions que el graf de VideoData
+        graf = GrafHash()
+        graf.insert_vertices((uuid, ElementData(filename=uuid)) for uuid in uuids)
+        graf.add_edge_weights(Counter(parell for llista in llistes for parell in zip(llista, llista[1:])))
+        temps["GrafHash.dijkstra"] = cronometra(graf.dijkstra, ((rnd.choice(uuids),) for _ in range(5)))
+        temps["GrafHash.__delitem__"] = cronometra(graf.__delitem__, ((uuid,) for uuid in rnd.sample(uuids, min(mostra, n))))
+        del graf
+
+        # SearchMetadata
+        cerca = SearchMetadata(video_data)
+        criteris = [({"artist": "Artista 1", "duration": (60, 300)},),
+                    (("or", ("genre", "jazz"), ("and", ("album", "Àlbum 12"), ("duration", (0, 120)))),)]
+        temps["SearchMetadata.search_complex"] = cronometra(cerca.search_complex, criteris)
+        top = video_data.get_top_videos(3)
+        temps["SearchMetadata.get_similar"] = cronometra(cerca.get_similar, ((uuid, 10) for uuid in top))
+        temps["SearchMetadata.get_similar_approx"] = cronometra(cerca.get_similar_approx, ((uuid, 10, 2) for uuid in top))
+        temps["SearchMetadata.get_auto_play"] = cronometra(cerca.get_auto_play, [(10,)])
+
+        # PlayList.load_file sobre un M3U amb la llista més llarga
+        arrel = tempfile.mkdtemp(prefix="bench_suite_")
+        try:
+            m3u = os.path.join(arrel, "llista.m3u")
+            llarga = max(llistes, key=len)
+            camins = dict(zip(uuids, fitxers))
+            with open(m3u, "w") as f:
+                f.write("#EXTM3U\n")
+                for uuid in llarga:
+                    f.write(f"#EXTINF:{video_data.get_duration(uuid)},{video_data.get_title(uuid)}\n{camins[uuid]}\n")
+            playlist = PlayList(video_id, VideoPlayer(video_data))
+            temps["PlayList.load_file_per_linia"] = cronometra(playlist.load_file, [(m3u,)]) / len(llarga)
+
+            # VideoFiles.reload_fs sobre un arbre real de com a molt max_fitxers fitxers
+            n_fitxers = min(n, max_fitxers)
+            arbre_aleatori(os.path.join(arrel, "videos"), n_fitxers)
+            video_files = VideoFiles()
+            temps["VideoFiles.reload_fs_inicial"] = cronometra(video_files.reload_fs, [(os.path.join(arrel, "videos"),)])
+            temps["VideoFiles.reload_fs_sense_canvis"] = cronometra(video_files.reload_fs, [(os.path.join(arrel, "videos"),)])
+        finally:
+            shutil.rmtree(arrel, ignore_errors=True)
+
+        resultats.append({
+            "videos": n,
+            "llistes": llistes_n,
+            "transicions": sum(len(llista) - 1 for llista in llistes),
+            "fitxers_reload_fs": min(n, max_fitxers),
+            "temps": temps,
+            "pic_memoria_bytes": pic,
+        })
+    return resultats
+
+
+def informe_suite(resultats, fitxer_json=None, compara=None, parametres=None):
+    """ Imprimeix la corba d'escalat (operació x N) i, si cal, desa el JSON i compara. """
+    operacions = list(resultats[0]["temps"])
+    print(f"{'operació (s/crida)':<40}" + "".join(f"{fila['videos']:>14}" for fila in resultats))
+    for op in operacions:
+        print(f"{op:<40}" + "".join(f"{fila['temps'][op]:>14.3e}" for fila in resultats))
+    print(f"{'pic memòria (MB)':<40}" + "".join(f"{fila['pic_memoria_bytes'] / 2 ** 20:>14.1f}" for fila in resultats))
+
+    if compara is not None:
+        with open(compara) as f:
+            base = {fila["videos"]: fila for fila in json.load(f)["resultats"]}
+        print(f"\nRàtio contra {compara} (>1 és més lent ara):")
+        for fila in resultats:
+            anterior = base.get(fila["videos"])
+            if anterior is None:
+                continue
+            for op, t in fila["temps"].items():
+                if anterior["temps"].get(op):
+                    print(f"N={fila['videos']:<9} {op:<40} {t / anterior['temps'][op]:6.2f}x")
+
+    if fitxer_json is not None:
+        try:
+            commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                    cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+        except OSError:
+            commit = None
+        with open(fitxer_json, "w") as f:
+            json.dump({
+                "commit": commit,
+                "python": sys.version,
+                "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "parametres": parametres or {},
+                "resultats": resultats,
+            }, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("bench", nargs="?", default="dijkstra", choices=["dijkstra", "playlists", "reload_fs", "memoria", "importtime", "arrencada", "suite"])
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1000, 10000, 100000])
+    parser.add_argument("--llistes", type=int, default=None, help="llistes per biblioteca (per defecte N/10)")
+    parser.add_argument("--llargada", type=int, default=20, help="llargada mitjana de les llistes")
+    parser.add_argument("--distribucio", default="geometrica", choices=["fixa", "uniforme", "geometrica"])
+    parser.add_argument("--json", default=None, help="desa els resultats de la suite en aquest fitxer")
+    parser.add_argument("--compara", default=None, help="JSON d'una execució anterior de la suite")
+    args = parser.parse_args()
+
+    if args.bench == "suite":
+        parametres = {"sizes": args.sizes, "llistes": args.llistes, "llargada": args.llargada,
+                      "distribucio": args.distribucio}
+        resultats = bench_suite(args.sizes, args.llistes, args.llargada, args.distribucio)
+        informe_suite(resultats, args.json, args.compara, parametres)
+        return
+
+    if args.bench == "arrencada":
+        for fila in bench_arrencada():
+            print("{motor:<10} prepara_seguent={prepara_seguent!s:<5}  mediana={mediana_ms:.2f} ms  "
+                  "màxim={maxim_ms:.2f} ms".format(**fila))
+        return
+
+    if args.bench == "importtime":
+        for fila in bench_importtime():
+            if fila["error"]:
+                print("{modul:<16} ERROR: {error}".format(**fila))
+            else:
+                print("{modul:<16} {ms:8.2f} ms  pesants={}".format(",".join(fila["pesants"]) or "-", **fila))
+        return
+
+    if args.bench == "memoria":
+        for fila in bench_memoria_metadata(args.sizes[-1]):
+            print("{videos} vídeos  llistes={llistes_bytes_per_video:.0f} B/vídeo  "
+                  "columnar={columnar_bytes_per_video:.0f} B/vídeo".format(**fila))
+        return
+
+    if args.bench == "reload_fs":
+        for fila in bench_reload_fs(args.sizes[-1]):
+            print("{fitxers} fitxers  inicial={inicial_s:.3f}s  reescaneig 1%={reescaneig_s:.3f}s  "
+                  "sense canvis={sense_canvis_s:.3f}s".format(**fila))
+        return
+
+    if args.bench == "playlists":
+        for fila in bench_playlists():
+            print("{transicions} transicions  antic={antic_tps:,.0f}/s  "
+                  "lot={lot_tps:,.0f}/s".format(**fila))
+        return
+
+    for fila in bench_dijkstra(args.sizes):
+        print("V={V:>8} E={E:>9}  dijkstra={dijkstra_s:.4f}s  "
+              "camiMesCurt={camiMesCurt_s:.4f}s  "
+              "t/((V+E)logV)={ns_per_unitat:.1f}ns".format(**fila))
+
+
+if __name__ == "__main__":
+    main()
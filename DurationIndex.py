@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+DurationIndex.py : Índex ordenat de durades per a consultes per rang.
+
+Dues llistes paral·leles ordenades per (durada, uuid) permeten trobar els
+límits d'un rang amb bisect en O(log N) i retornar-ne els k elements.
+"""
+import bisect
+
+
+class DurationIndex:
+    __slots__ = ['__durades', '__uuids', '__durada_de']
+
+    def __init__(self):
+        self.__durades = []
+        self.__uuids = []
+        self.__durada_de = {}  # uuid -> durada indexada
+
+    def __posicio(self, durada, uuid):
+        """ Posició de (durada, uuid) dins l'ordre de les llistes. """
+        lo = bisect.bisect_left(self.__durades, durada)
+        hi = bisect.bisect_right(self.__durades, durada, lo)
+        return bisect.bisect_left(self.__uuids, uuid, lo, hi)
+
+    def add(self, uuid, durada):
+        """ Indexa (o actualitza) la durada d'un uuid. """
+        if uuid in self.__durada_de and self.__durada_de[uuid] == durada:
+            return
+        self.remove(uuid)
+        i = self.__posicio(durada, uuid)
+        self.__durades.insert(i, durada)
+        self.__uuids.insert(i, uuid)
+        self.__durada_de[uuid] = durada
+
+    def update(self, parells):
+        """ Indexa molts (uuid, durada) alhora; si el lot és gran, reordena una sola vegada. """
+        parells = list(parells)
+        if len(parells) < len(self.__uuids) // 16:
+            for uuid, durada in parells:
+                self.add(uuid, durada)
+            return
+        self.__durada_de.update(parells)
+        ordenats = sorted((durada, uuid) for uuid, durada in self.__durada_de.items())
+        self.__durades = [durada for durada, _ in ordenats]
+        self.__uuids = [uuid for _, uuid in ordenats]
+
+    def remove(self, uuid):
+        if uuid not in self.__durada_de:
+            return
+        durada = self.__durada_de.pop(uuid)
+        i = self.__posicio(durada, uuid)
+        del self.__durades[i]
+        del self.__uuids[i]
+
+    def __limits(self, min_durada, max_durada):
+        lo = bisect.bisect_left(self.__durades, min_durada)
+        hi = bisect.bisect_right(self.__durades, max_durada, lo)
+        return lo, hi
+
+    def range(self, min_durada, max_durada):
+        """ UUIDs amb min_durada <= durada <= max_durada, en ordre de durada. O(log N + k). """
+        lo, hi = self.__limits(min_durada, max_durada)
+        return self.__uuids[lo:hi]
+
+    def count(self, min_durada, max_durada):
+        """ Nombre d'UUIDs dins el rang sense construir-ne la llista. O(log N). """
+        lo, hi = self.__limits(min_durada, max_durada)
+        return hi - lo
+
+    def get(self, uuid):
+        return self.__durada_de.get(uuid)
+
+    def __len__(self):
+        return len(self.__uuids)
+
+    def __contains__(self, uuid):
+        return uuid in self.__durada_de
+
+    def __repr__(self):
+        return f"DurationIndex({len(self)} durades)"
@@ -5,7 +5,37 @@ ElementData.py : ** REQUIRED ** El vostre codi de la classe PlayList.
 import cfg
 import os
 
-class ElementData:
+class ElementBase:
+    """
+    Base sense atributs propis dels elements del graf: la igualtat, l'ordre i
+    el hash van pel filename. ElementData guarda els valors; una vista com
+    MetadataStore.ElementRow els llegeix d'un altre lloc sense heretar-ne
+    els slots.
+    """
+    __slots__ = []
+
+    def __eq__(self, other):
+        # Comparar solo si 'other' es un elemento y basarse en 'filename'
+        if not isinstance(other, ElementBase):
+            return False
+        return self.filename == other.filename
+
+    def __ne__(self, other):
+        # La desigualdad se invierte a partir de la comparación de igualdad
+        return not self.__eq__(other)
+
+    def __lt__(self, other):
+        # Comparación lexicográfica de 'filename'
+        if not isinstance(other, ElementBase):
+            return NotImplemented
+        return self.filename < other.filename
+
+    def __hash__(self):
+        # Asegurarse de que el hash se basa en 'filename'
+        return hash(self.filename)
+
+
+class ElementData(ElementBase):
     __slots__ = ['__title', '__artist', '__album', '__composer', '__genre', '__date', '__comment', '__duration', '__filename']
     
     def __init__(self, title="", artist="", album="", composer="", genre="", date="", comment="", duration=0, filename=""):
@@ -22,26 +52,6 @@ class ElementData:
     def __repr__(self):
         return f"ElementData(title={self.__title}, artist={self.__artist}, album={self.__album}, filename={self.__filename})"
     
-    def __eq__(self, other):
-        # Comparar solo si 'other' es una instancia de ElementData y basarse en 'filename'
-        if not isinstance(other, ElementData):
-            return False
-        return self.__filename == other.__filename
-
-    def __ne__(self, other):
-        # La desigualdad se invierte a partir de la comparación de igualdad
-        return not self.__eq__(other)
-    
-    def __lt__(self, other):
-        # Comparación lexicográfica de 'filename'
-        if not isinstance(other, ElementData):
-            return NotImplemented
-        return self.__filename < other.__filename
-    
-    def __hash__(self):
-        # Asegurarse de que el hash se basa en 'filename'
-        return hash(self.__filename)
-
     # Propiedades (sin setters, solo getters)
     @property
     def title(self):
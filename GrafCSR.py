@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+GrafCSR.py : Instantània de només lectura d'un GrafHash en format CSR.
+
+Els vèrtexs es renumeren amb ids densos 0..V-1 i les arestes es guarden en
+tres arrays de NumPy per sentit: indptr (V+1), indices (E, int32) i
+weights (E, float64). Les arestes del vèrtex i són indices[indptr[i]:indptr[i+1]].
+"""
+import numpy
+
+
+class GrafCSR:
+    """Graf congelat amb Compressed Sparse Row structure."""
+    __slots__ = ["__claus", "__ids", "__out", "__in"]
+
+    def __init__(self, claus, out, inn=None):
+        """ claus: seqüència id -> clau; out/inn: tuples (indptr, indices, weights). """
+        self.__claus = tuple(claus)
+        self.__ids = {clau: i for i, clau in enumerate(self.__claus)}
+        self.__out = tuple(self.__nomes_lectura(a) for a in out)
+        self.__in = self.__out if inn is None else tuple(self.__nomes_lectura(a) for a in inn)
+
+    @staticmethod
+    def __nomes_lectura(array):
+        array = numpy.ascontiguousarray(array)
+        array.setflags(write=False)
+        return array
+
+    @classmethod
+    def from_adjacency(cls, claus, out, inn):
+        """ Construeix el CSR a partir dels mapes d'adjacència de GrafHash. """
+        claus = list(claus)
+        ids = {clau: i for i, clau in enumerate(claus)}
+        sentit_out = cls.__comprimeix(claus, ids, out)
+        sentit_in = None if inn is out else cls.__comprimeix(claus, ids, inn)
+        return cls(claus, sentit_out, sentit_in)
+
+    @staticmethod
+    def __comprimeix(claus, ids, adj):
+        graus = numpy.fromiter((len(adj[clau]) for clau in claus), dtype=numpy.int64, count=len(claus))
+        indptr = numpy.zeros(len(claus) + 1, dtype=numpy.int64)
+        numpy.cumsum(graus, out=indptr[1:])
+        n_arestes = int(indptr[-1])
+        indices = numpy.fromiter((ids[vei] for clau in claus for vei in adj[clau]),
+                                 dtype=numpy.int32, count=n_arestes)
+        weights = numpy.fromiter((pes for clau in claus for pes in adj[clau].values()),
+                                 dtype=numpy.float64, count=n_arestes)
+        return indptr, indices, weights
+
+    def es_digraf(self):
+        return self.__out is not self.__in
+
+    def __len__(self):
+        return len(self.__claus)
+
+    def num_arestes(self):
+        return len(self.__out[1])
+
+    def __contains__(self, key):
+        return key in self.__ids
+
+    def __iter__(self):
+        return iter(self.__claus)
+
+    def index(self, key):
+        """ Id dens del vèrtex key. """
+        if key not in self.__ids:
+            raise KeyError(f"El node amb clau {key} no existeix.")
+        return self.__ids[key]
+
+    def clau(self, i):
+        """ Clau original del vèrtex amb id i. """
+        return self.__claus[i]
+
+    def claus(self, ids):
+        """ Claus originals d'un array d'ids. """
+        return [self.__claus[i] for i in ids]
+
+    def arrays(self, invers=False):
+        """ (indptr, indices, weights) d'un sentit; vistes de només lectura. """
+        return self.__in if invers else self.__out
+
+    def veins(self, key, invers=False):
+        """ (ids, pesos) dels veïns de key, com a vistes sense còpia. """
+        indptr, indices, weights = self.arrays(invers)
+        i = self.index(key)
+        return indices[indptr[i]:indptr[i + 1]], weights[indptr[i]:indptr[i + 1]]
+
+    def veins_out(self, key):
+        return self.veins(key)
+
+    def veins_in(self, key):
+        return self.veins(key, invers=True)
+
+    def grau_pes_out(self):
+        """ Array amb el grau ponderat de sortida de cada vèrtex. """
+        return self.__grau_pes(self.__out)
+
+    def grau_pes_in(self):
+        """ Array amb el grau ponderat d'entrada de cada vèrtex. """
+        return self.__grau_pes(self.__in)
+
+    def __grau_pes(self, sentit):
+        indptr, _, weights = sentit
+        files = numpy.repeat(numpy.arange(len(self.__claus)), numpy.diff(indptr))
+        return numpy.bincount(files, weights=weights, minlength=len(self.__claus))
+
+    def __frontera(self, frontera, sentit):
+        """ Tots els veïns (amb repeticions) dels ids de frontera, sense bucles Python. """
+        indptr, indices, _ = sentit
+        inici = indptr[frontera]
+        llargades = indptr[frontera + 1] - inici
+        total = int(llargades.sum())
+        if total == 0:
+            return indices[:0]
+        # Posició dins de indices de cada aresta de la frontera
+        desplacament = numpy.repeat(inici - numpy.cumsum(llargades) + llargades, llargades)
+        return indices[desplacament + numpy.arange(total)]
+
+    def bfs(self, key, invers=False, max_salts=None):
+        """
+        BFS per fronteres vectoritzat. Retorna un array amb el nombre de
+        salts des de key per a cada id (-1 si no és assolible).
+        """
+        sentit = self.arrays(invers)
+        nivells = numpy.full(len(self.__claus), -1, dtype=numpy.int32)
+        frontera = numpy.array([self.index(key)], dtype=numpy.int64)
+        nivells[frontera] = 0
+        salt = 0
+        while len(frontera) and (max_salts is None or salt < max_salts):
+            salt += 1
+            veins = self.__frontera(frontera, sentit)
+            veins = numpy.unique(veins[nivells[veins] < 0])
+            nivells[veins] = salt
+            frontera = veins.astype(numpy.int64)
+        return nivells
+
+    def nbytes(self):
+        """ Memòria ocupada pels arrays d'arestes. """
+        total = sum(a.nbytes for a in self.__out)
+        if self.es_digraf():
+            total += sum(a.nbytes for a in self.__in)
+        return total
+
+    def __repr__(self):
+        return f"GrafCSR(vertices={len(self)}, edges={self.num_arestes()})"
+
+    def __str__(self):
+        return f"GrafCSR freezing {len(self)} vertices and {self.num_arestes()} edges"
@@ -1,12 +1,18 @@
 import cfg
 import math
 import copy
-from ElementData import ElementData
-from collections import defaultdict
+import heapq
+import itertools
+import bisect
+import Metrics
+from ElementData import ElementData, ElementBase
+from collections import defaultdict, Counter
+from collections.abc import Mapping
 
 class GrafHash:
     """Graf amb Adjacency Map structure."""
-    __slots__ = ["__nodes","__out","__in"]
+    __slots__ = ["__nodes","__out","__in","__grau_out","__grau_in",
+                 "__ranking","__rank_actual","__rank_brut"]
     
     class Vertex:
         __slots__ = ["__value"]
@@ -37,7 +43,14 @@ class GrafHash:
         self.__nodes = {}  # Store vertices
         self.__out = {}  # Store outgoing edges
         self.__in = {} if digraf else self.__out # Store incoming edges
-        
+        # Graus ponderats mantinguts en O(1) per cada canvi d'aresta
+        self.__grau_out = {}
+        self.__grau_in = {} if digraf else self.__grau_out
+        # Rànquing ordenat per (-rank, clau); es corregeix mandrosament amb __rank_brut
+        self.__ranking = []
+        self.__rank_actual = {}
+        self.__rank_brut = set()
+
         for n in ln:
             self.insert_vertex(n, n)
         if lp==[]:
@@ -48,29 +61,84 @@ class GrafHash:
                 self.insert_edge(vA[0],vA[1],pA)
     
     def es_digraf(self):
-        return self.__out!=self.__in
+        # Identitat, no igualtat: comparar els dicts seria O(V) i fallaria amb un digraf simètric
+        return self.__out is not self.__in
 
     def getOut(self):
         return self.__out
 
     def insert_vertex(self, key, e: ElementData):
         """ Insert a vertex into the graph with a given key and an ElementData instance. """
-        if not isinstance(e, ElementData):
+        if not isinstance(e, ElementBase):
             raise TypeError(f"Expected e to be of type ElementData, but got {type(e)}. Key: {key}")
         if key in self.__nodes:  
             return self.__nodes[key]
         vertex = self.Vertex(e)  
         self.__nodes[key] = vertex
         self.__out[key] = {}  
+        self.__grau_out[key] = 0
         if self.es_digraf():  
             self.__in[key] = {}
+            self.__grau_in[key] = 0
+        self.__rank_brut.add(key)
         return vertex
 
 
+    def insert_vertices(self, parells):
+        """ Insereix molts (key, ElementData) d'una passada; les claus existents es mantenen. """
+        digraf = self.es_digraf()
+        for key, e in parells:
+            if not isinstance(e, ElementBase):
+                raise TypeError(f"Expected e to be of type ElementData, but got {type(e)}. Key: {key}")
+            if key in self.__nodes:
+                continue
+            self.__nodes[key] = self.Vertex(e)
+            self.__out[key] = {}
+            self.__grau_out[key] = 0
+            if digraf:
+                self.__in[key] = {}
+                self.__grau_in[key] = 0
+            self.__rank_brut.add(key)
+
     def insert_edge(self, key1, key2, weight=1):
         """ Insert an edge between two vertices with an optional weight. """
-        self.__out[key1][key2] = weight
+        self.__assigna_pes(key1, key2, weight)
+
+    def add_edge_weights(self, pairs):
+        """
+        Suma pesos a moltes arestes d'una sola passada, creant les que falten.
+        pairs pot ser un iterable de parells (key1, key2), que compten 1 cada un,
+        o un mapa {(key1, key2): increment} com un collections.Counter.
+        """
+        if not isinstance(pairs, Mapping):
+            pairs = Counter(pairs)
+        out, inn = self.__out, self.__in
+        grau_out, grau_in = self.__grau_out, self.__grau_in
+        digraf = self.es_digraf()
+        brut = self.__rank_brut
+        for (key1, key2), increment in pairs.items():
+            arestes = out[key1]
+            nou = arestes.get(key2, 0) + increment
+            arestes[key2] = nou
+            inn[key2][key1] = nou
+            grau_out[key1] += increment
+            if digraf or key1 != key2:
+                grau_in[key2] += increment
+            brut.add(key1)
+            brut.add(key2)
+
+    def __assigna_pes(self, key1, key2, weight):
+        """ Escriu el pes de l'aresta i ajusta els graus amb la diferència. """
+        arestes = self.__out[key1]
+        delta = weight - arestes.get(key2, 0)
+        arestes[key2] = weight
         self.__in[key2][key1] = weight
+        self.__grau_out[key1] += delta
+        # En mode no dirigit un bucle només compta una vegada
+        if self.es_digraf() or key1 != key2:
+            self.__grau_in[key2] += delta
+        self.__rank_brut.add(key1)
+        self.__rank_brut.add(key2)
 
     def get(self, key) -> ElementData:
         """ Get the ElementData associated with the key. """
@@ -90,18 +158,36 @@ class GrafHash:
     def __delitem__(self, key):
         """ Remove a vertex and its associated edges from the graph. """
         if key in self.__nodes:
-            del self.__nodes[key]
-            del self.__out[key]
-            for arestes_out in self.__out.values():
-                if key in arestes_out:
-                    del arestes_out[key]
-           
-            if self.es_digraf():
-                del self.__in[key]
-                for arestes_in in self.__in.values():
-                    if key in arestes_in:
-                        del arestes_in[key]
-
+            self.__treu_vertex(key)
+
+    def remove_vertices(self, keys):
+        """ Elimina un lot de vèrtexs en una sola passada (les claus inexistents s'ignoren). """
+        for key in keys:
+            if key in self.__nodes:
+                self.__treu_vertex(key)
+
+    def __treu_vertex(self, key):
+        """ Esborra key tocant només els seus veïns, no tot el graf. """
+        del self.__nodes[key]
+        sortints = self.__out.pop(key)
+        del self.__grau_out[key]
+        self.__rank_brut.add(key)
+        if self.es_digraf():
+            entrants = self.__in.pop(key)
+            del self.__grau_in[key]
+            for vei, pes in sortints.items():
+                if vei != key:
+                    del self.__in[vei][key]
+                    self.__grau_in[vei] -= pes
+                    self.__rank_brut.add(vei)
+        else:
+            # __in és __out: les arestes entrants són les mateixes
+            entrants = sortints
+        for vei, pes in entrants.items():
+            if vei != key:
+                del self.__out[vei][key]
+                self.__grau_out[vei] -= pes
+                self.__rank_brut.add(vei)
 
     def __existeix_edge(self,n1,n2):
         if n2 in self.__out[n1]:
@@ -114,16 +200,87 @@ class GrafHash:
 
     def edges_in(self, x):
         return self.__in[x].__iter__()
+
+    def edges_inv(self, key):
+        """ Iterador de (predecessor, pes) de les arestes entrants a key. """
+        if key not in self.__nodes:
+            raise KeyError(f"El node amb clau {key} no existeix.")
+        return iter(self.__in[key].items())
      
     def grauPesIn(self,x):
-        if x not in self.__in:
+        if x not in self.__grau_in:
             raise KeyError("El node no existeix")
-        return sum(self.__in[x].values())
+        return self.__grau_in[x]
        
     def grauPesOut(self,x):
-        if x not in self.__out:
+        if x not in self.__grau_out:
             raise KeyError("El node no existeix")
-        return sum(self.__out[x].values())
+        return self.__grau_out[x]
+
+    def rank(self, x):
+        """ Grau ponderat total (entrada + sortida) d'un vèrtex. """
+        return self.grauPesOut(x) + self.grauPesIn(x)
+
+    def top_rank(self, k):
+        """ Les k claus de rank més alt, desempatant per clau ascendent. """
+        self.__actualitza_ranking()
+        return [key for _, key in self.__ranking[:k]]
+
+    def __actualitza_ranking(self):
+        """ Aplica al rànquing els vèrtexs que han canviat des de l'última lectura. """
+        brut = self.__rank_brut
+        if not brut:
+            return
+        if len(brut) > len(self.__ranking) // 8:
+            # Massa canvis: surt més a compte reordenar-ho tot
+            self.__rank_actual = {key: self.rank(key) for key in self.__nodes}
+            self.__ranking = sorted((-r, key) for key, r in self.__rank_actual.items())
+        else:
+            for key in brut:
+                if key in self.__rank_actual:
+                    entrada = (-self.__rank_actual.pop(key), key)
+                    del self.__ranking[bisect.bisect_left(self.__ranking, entrada)]
+                if key in self.__nodes:
+                    r = self.rank(key)
+                    self.__rank_actual[key] = r
+                    bisect.insort(self.__ranking, (-r, key))
+        brut.clear()
+
+    def freeze(self):
+        """ Instantània CSR de només lectura (GrafCSR) per a analítica vectoritzada. """
+        from GrafCSR import GrafCSR  # numpy només quan es congela
+        return GrafCSR.from_adjacency(self.__nodes, self.__out, self.__in)
+
+    @classmethod
+    def from_csr(cls, csr, elements):
+        """
+        Reconstrueix un GrafHash a partir d'un GrafCSR i dels ElementData dels
+        seus vèrtexs (en l'ordre de les claus del CSR). Els pesos conserven el
+        tipus de l'array: amb weights enters les arestes tornen a ser int.
+        """
+        graf = cls(digraf=csr.es_digraf())
+        claus = list(csr)
+        graf.__nodes = {key: cls.Vertex(e) for key, e in zip(claus, elements)}
+        if len(graf.__nodes) != len(claus):
+            raise ValueError("Cal un ElementData per cada vèrtex del CSR.")
+        graf.__out, graf.__grau_out = cls.__descomprimeix(claus, csr.arrays(), csr.grau_pes_out())
+        if csr.es_digraf():
+            graf.__in, graf.__grau_in = cls.__descomprimeix(claus, csr.arrays(invers=True), csr.grau_pes_in())
+        else:
+            graf.__in, graf.__grau_in = graf.__out, graf.__grau_out
+        graf.__rank_brut = set(claus)
+        return graf
+
+    @staticmethod
+    def __descomprimeix(claus, sentit, graus):
+        """ Dicts d'adjacència i de graus d'un sentit del CSR; un sol tolist() per array. """
+        indptr, indices, weights = sentit
+        veins = list(map(claus.__getitem__, indices.tolist()))
+        pesos = weights.tolist()
+        limits = indptr.tolist()
+        adj = {key: dict(zip(veins[limits[i]:limits[i + 1]], pesos[limits[i]:limits[i + 1]]))
+               for i, key in enumerate(claus)}
+        return adj, dict(zip(claus, graus.astype(weights.dtype).tolist()))
 
     def itera(self):
         return self.__nodes.keys().__iter__()
@@ -170,8 +327,7 @@ class GrafHash:
     def update_edge_weight(self, key1, key2, weight):
         """ Actualiza el peso de la arista entre dos vértices. """
         if key2 in self.__out.get(key1, {}):
-            self.__out[key1][key2] = weight
-            self.__in[key2][key1] = weight
+            self.__assigna_pes(key1, key2, weight)
         else:
             raise KeyError(f"No edge exists between {key1} and {key2}")
             
@@ -184,45 +340,129 @@ class GrafHash:
                 node_min = node
         return node_min
 
-    def dijkstra(self, n):
-        dist = {nAux: math.inf for nAux in self.__out}
-        visitats = set()
+    def __dijkstra(self, adj, n1, n2=None, destins=None, max_pes=None, permesos=None):
+        """ Dijkstra amb heap binari i esborrat mandrós sobre el mapa adj.
+
+        La prioritat és (pes, salts): entre camins del mateix pes es queda
+        el de menys arestes, de manera que el resultat no depèn del sentit
+        en què es recorre el graf. Només els vèrtexs assolits apareixen a
+        dist. Si es dona n2, s'atura tan bon punt n2 surt del heap; amb un
+        conjunt destins, quan n'han sortit tots. En aturar-se abans d'hora
+        només són definitives les distàncies dels vèrtexs ja extrets.
+        Amb max_pes s'atura en extreure el primer vèrtex més llunyà; amb
+        permesos (un conjunt) no surt mai d'aquests vèrtexs.
+        Cost O((V+E) log V).
+        """
+        dist = {n1: 0}
+        salts = {n1: 0}
         predecessors = {}
-        dist[n] = 0
-
-        for _ in range(len(self.__nodes) - 1):
-            node_min = self.minDistance(dist, visitats)
-            if node_min is None:
+        visitats = set()
+        ordre = itertools.count()  # desempat estable sense comparar claus
+        heap = [(0, 0, next(ordre), n1)]
+        pendents = None if destins is None else set(destins)
+        while heap:
+            d, h, _, node_min = heapq.heappop(heap)
+            if node_min in visitats:
+                continue  # entrada obsoleta
+            if node_min == n2 or (max_pes is not None and d > max_pes):
                 break
+            if pendents is not None:
+                pendents.discard(node_min)
+                if not pendents:
+                    break
             visitats.add(node_min)
-            if node_min in self.__out:
-                for n2, p2 in self.__out[node_min].items():
-                    if n2 not in visitats:
-                        if dist[node_min] + p2 < dist[n2]:
-                            predecessors[n2] = node_min
-                            dist[n2] = dist[node_min] + p2
-
+            for nAux, pes in adj.get(node_min, {}).items():
+                if nAux in visitats or (permesos is not None and nAux not in permesos):
+                    continue
+                nova = (d + pes, h + 1)
+                if nova < (dist.get(nAux, math.inf), salts.get(nAux, 0)):
+                    dist[nAux], salts[nAux] = nova
+                    predecessors[nAux] = node_min
+                    heapq.heappush(heap, (nova[0], nova[1], next(ordre), nAux))
+        if Metrics.is_enabled():
+            # Cada vèrtex expandit ha examinat totes les seves arestes de sortida
+            Metrics.traversal("grafhash_recorregut", len(visitats), sum(len(adj.get(v, ())) for v in visitats))
+        return dist, salts, predecessors
+
+    @Metrics.timed("grafhash_dijkstra")
+    def dijkstra(self, n):
+        dist, _, predecessors = self.__dijkstra(self.__out, n)
         return dist, predecessors
 
+    @Metrics.timed("grafhash_dijkstra_modif")
     def dijkstraModif(self, n1, n2):
-        dist = {nAux: math.inf for nAux in self.__out}
-        visitats = set()
-        predecessors = {}
-        dist[n1] = 0
+        dist, _, predecessors = self.__dijkstra(self.__out, n1, n2)
+        return dist, predecessors
 
-        for _ in range(len(self.__nodes) - 1):
-            node_min = self.minDistance(dist, visitats)
-            if node_min is None or node_min == n2:
+    @Metrics.timed("grafhash_distancies")
+    def distancies(self, n, invers=False, destins=None):
+        """ Camí mínim des de n cap a tots els vèrtexs assolibles.
+
+        Retorna {desti: (salts, pes)} sense incloure n. Amb invers=True es
+        recorren les arestes d'entrada, és a dir, dona el camí de cada
+        vèrtex cap a n. Una sola passada serveix per a tots els destins.
+        Amb destins, el recorregut s'atura quan tots estan resolts i només
+        es retornen els d'aquest conjunt.
+        """
+        if n not in self.__nodes:
+            raise KeyError(f"El node amb clau {n} no existeix.")
+        adj = self.__in if invers else self.__out
+        if destins is None:
+            dist, salts, _ = self.__dijkstra(adj, n)
+            return {node: (salts[node], pes) for node, pes in dist.items() if node != n}
+        destins = {node for node in destins if node in self.__nodes and node != n}
+        if not destins:
+            return {}
+        dist, salts, _ = self.__dijkstra(adj, n, destins=destins)
+        return {node: (salts[node], dist[node]) for node in destins if node in dist}
+
+    @Metrics.timed("grafhash_distancies_locals")
+    def distancies_locals(self, n, invers=False, max_salts=None, max_pes=None):
+        """ Com distancies, però només dins d'un radi al voltant de n.
+
+        Amb max_salts el recorregut no surt dels vèrtexs a com a molt
+        max_salts arestes de n, i les distàncies són les del subgraf que
+        formen; amb max_pes s'atura en superar aquest pes. Retorna
+        (distàncies, expandits), on expandits és el nombre de vèrtexs
+        extrets del heap: el cost depèn del veïnatge de n, no de la mida
+        del graf.
+        """
+        if n not in self.__nodes:
+            raise KeyError(f"El node amb clau {n} no existeix.")
+        adj = self.__in if invers else self.__out
+        permesos = None if max_salts is None else self.__bola(adj, n, max_salts)
+        dist, salts, _ = self.__dijkstra(adj, n, max_pes=max_pes, permesos=permesos)
+        if max_pes is not None:
+            # Els que queden al heap per sobre del radi no són definitius
+            dist = {node: pes for node, pes in dist.items() if pes <= max_pes}
+        return {node: (salts[node], pes) for node, pes in dist.items() if node != n}, len(dist)
+
+    @staticmethod
+    def __bola(adj, n, max_salts):
+        """ Vèrtexs a com a molt max_salts arestes de n (recorregut en amplada). """
+        bola = {n}
+        frontera = [n]
+        for _ in range(max_salts):
+            seguent = []
+            for node in frontera:
+                for vei in adj.get(node, ()):
+                    if vei not in bola:
+                        bola.add(vei)
+                        seguent.append(vei)
+            if not seguent:
                 break
-            visitats.add(node_min)
-            if node_min in self.__out:
-                for nAux, pes in self.__out[node_min].items():
-                    if nAux not in visitats:
-                        if dist[node_min] + pes < dist[nAux]:
-                            predecessors[nAux] = node_min
-                            dist[nAux] = dist[node_min] + pes
-
-        return dist, predecessors
+            frontera = seguent
+        return bola
+
+    @Metrics.timed("grafhash_distancia")
+    def distancia(self, n1, n2):
+        """ (salts, pes) del camí mínim de n1 a n2, o None si no n'hi ha. """
+        if n1 not in self.__nodes or n2 not in self.__nodes or n1 == n2:
+            return None
+        dist, salts, _ = self.__dijkstra(self.__out, n1, n2)
+        if n2 not in dist:
+            return None
+        return salts[n2], dist[n2]
 
     def camiMesCurt(self, n1, n2):
         path = []
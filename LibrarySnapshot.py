@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+LibrarySnapshot.py : Instantània binària de VideoID, VideoData i el graf.
+
+Format (versió 1), tot en little-endian:
+
+    capçalera   "EDLIBSNP" + versió (u32) + mida del directori (u32)
+    directori   JSON amb, per a cada secció, offset, mida, dtype i forma
+    seccions    blocs alineats a 64 bytes
+
+Les seccions són arrays crus (durades, ids de valors internats,
+indptr/indices/weights del graf en CSR) o taules de text UTF-8 separades
+per NUL (uuids, noms de fitxer, rutes, valors dels tags). En carregar, el fitxer es mapeja amb mmap i els arrays es
+llegeixen amb numpy.frombuffer sense còpia; cada taula de text es descodifica
+amb un sol split. Els índexs de text i de durada no es guarden: VideoData els
+reconstrueix en la primera consulta.
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+import numpy
+from GrafCSR import GrafCSR
+from MetadataStore import CAMPS, CAMPS_INTERNATS
+from VideoData import VideoData
+from VideoID import VideoID
+
+MAGIC = b"EDLIBSNP"
+VERSIO = 1
+CAPCALERA = struct.Struct("<8sII")
+ALINEACIO = 64
+
+# Tipus dels valors de les taules de valors (els tags poden ser str, None, int o float)
+_STR, _NONE, _INT, _FLOAT = 0, 1, 2, 3
+
+
+def _alinea(n):
+    return -n % ALINEACIO
+
+
+def _codifica_text(textos):
+    """ Taula de text -> (bytes, info). Amb NUL dins d'algun text es guarda en JSON. """
+    if any("\0" in text for text in textos):
+        return json.dumps(textos).encode("utf-8", "surrogatepass"), {"tipus": "json"}
+    return "\0".join(textos).encode("utf-8", "surrogateescape"), {"tipus": "text", "n": len(textos)}
+
+
+def _codifica_valors(valors):
+    """ Llista de valors de tags -> (textos, array de tipus). """
+    tipus = numpy.zeros(len(valors), dtype="<u1")
+    textos = []
+    for i, valor in enumerate(valors):
+        if type(valor) is str:
+            textos.append(valor)
+            continue
+        if valor is None:
+            tipus[i] = _NONE
+        elif type(valor) is int:
+            tipus[i] = _INT
+        elif type(valor) is float:
+            tipus[i] = _FLOAT
+        else:
+            raise TypeError(f"Valor de tipus {type(valor)} no suportat a la instantània: {valor!r}")
+        textos.append("" if valor is None else repr(valor))
+    return textos, tipus
+
+
+def _pesos(weights):
+    """ Els pesos de co-reproducció són enters: es guarden com a int64 si ho són tots. """
+    if len(weights) and numpy.all(numpy.isfinite(weights)) and numpy.all(weights == numpy.round(weights)) \
+            and numpy.abs(weights).max() < 2 ** 53:
+        return weights.astype("<i8")
+    return weights.astype("<f8", copy=False)
+
+
+def save_snapshot(path, video_id, video_data):
+    """
+    Desa video_id i video_data (metadata i graf) a path. S'escriu a un
+    fitxer temporal i es renombra, de manera que path sempre és complet.
+    """
+    if not isinstance(video_id, VideoID):
+        raise NotImplementedError("Se requiere una instancia válida de VideoID.")
+    if not isinstance(video_data, VideoData):
+        raise NotImplementedError("Se requiere una instancia válida de VideoData.")
+    seccions = {}
+
+    def text(nom, textos):
+        seccions[nom] = _codifica_text(textos)
+
+    def crus(nom, valors):
+        valors = numpy.ascontiguousarray(valors)
+        seccions[nom] = (valors.tobytes(), {"tipus": "array", "dtype": valors.dtype.str,
+                                            "shape": list(valors.shape)})
+
+    def valors(nom, llista):
+        textos, tipus = _codifica_valors(llista)
+        text(nom, textos)
+        crus(nom + ".tipus", tipus)
+
+    parells = list(video_id.items())
+    text("id.uuids", [id_uuid for id_uuid, _ in parells])
+    text("id.fitxers", [fitxer for _, fitxer in parells])
+
+    uuids, columnes, csr = video_data.snapshot_state()
+    text("uuids", uuids)
+    text("filename", columnes["filename"])
+    text("path", columnes["path"])
+    crus("duration", numpy.asarray(columnes["duration"], dtype="<i8"))
+    crus("loaded", numpy.asarray(columnes["loaded"], dtype="<u1"))
+    for camp in CAMPS:
+        if camp in CAMPS_INTERNATS:
+            crus(camp, numpy.asarray(columnes[camp][0], dtype="<u4"))
+        else:
+            valors(camp, columnes[camp])
+    # Tots els camps internats comparteixen la mateixa taula de valors
+    valors("valors", columnes[CAMPS_INTERNATS[0]][1])
+
+    sentits = [("out", False), ("in", True)] if csr.es_digraf() else [("out", False)]
+    for nom, invers in sentits:
+        indptr, indices, weights = csr.arrays(invers)
+        crus(nom + ".indptr", indptr.astype("<i8", copy=False))
+        crus(nom + ".indices", indices.astype("<i4", copy=False))
+        crus(nom + ".weights", _pesos(weights))
+
+    # Offsets relatius a l'inici de les dades, que comença alineat després del directori
+    directori = {"digraf": csr.es_digraf(), "seccions": {}}
+    offset = 0
+    for nom, (dades, info) in seccions.items():
+        directori["seccions"][nom] = dict(info, offset=offset, nbytes=len(dades))
+        offset += len(dades) + _alinea(len(dades))
+    codificat = json.dumps(directori).encode("utf-8")
+    inici = CAPCALERA.size + len(codificat)
+
+    temporal = f"{path}.tmp"
+    with open(temporal, "wb") as f:
+        f.write(CAPCALERA.pack(MAGIC, VERSIO, len(codificat)))
+        f.write(codificat)
+        f.write(b"\0" * _alinea(inici))
+        for dades, _ in seccions.values():
+            f.write(dades)
+            f.write(b"\0" * _alinea(len(dades)))
+    os.replace(temporal, path)
+
+
+class _Lector:
+    """ Accés a les seccions d'una instantània mapejada en memòria. """
+    __slots__ = ['__mm', '__inici', '__seccions', 'digraf']
+
+    def __init__(self, mm):
+        magic, versio, mida = CAPCALERA.unpack_from(mm, 0)
+        if magic != MAGIC:
+            raise ValueError("No és una instantània de biblioteca.")
+        if versio != VERSIO:
+            raise ValueError(f"Versió d'instantània {versio} no suportada (s'esperava {VERSIO}).")
+        directori = json.loads(bytes(mm[CAPCALERA.size:CAPCALERA.size + mida]).decode("utf-8"))
+        self.__mm = mm
+        self.__inici = CAPCALERA.size + mida + _alinea(CAPCALERA.size + mida)
+        self.__seccions = directori["seccions"]
+        self.digraf = directori["digraf"]
+
+    def __bytes(self, info):
+        inici = self.__inici + info["offset"]
+        return self.__mm[inici:inici + info["nbytes"]]
+
+    def te(self, nom):
+        return nom in self.__seccions
+
+    def array(self, nom):
+        """ Vista numpy sense còpia (de només lectura) sobre el fitxer. """
+        info = self.__seccions[nom]
+        dtype = numpy.dtype(info["dtype"])
+        valors = numpy.frombuffer(self.__mm, dtype=dtype, count=info["nbytes"] // dtype.itemsize,
+                                  offset=self.__inici + info["offset"])
+        return valors.reshape(info["shape"])
+
+    def text(self, nom):
+        info = self.__seccions[nom]
+        if info["tipus"] == "json":
+            return json.loads(self.__bytes(info).decode("utf-8", "surrogatepass"))
+        if info["n"] == 0:
+            return []
+        return self.__bytes(info).decode("utf-8", "surrogateescape").split("\0")
+
+    def valors(self, nom):
+        valors = self.text(nom)
+        tipus = self.array(nom + ".tipus")
+        for i in numpy.flatnonzero(tipus).tolist():
+            t = tipus[i]
+            valors[i] = None if t == _NONE else int(valors[i]) if t == _INT else float(valors[i])
+        return valors
+
+    def columna(self, nom, typecode):
+        """ Secció numèrica com a array.array modificable (còpia directa si el format coincideix). """
+        columna = array(typecode)
+        if numpy.dtype(self.__seccions[nom]["dtype"]) == numpy.dtype(columna.typecode) \
+                and sys.byteorder == "little":
+            columna.frombytes(self.__bytes(self.__seccions[nom]))
+        else:
+            columna.extend(self.array(nom).tolist())
+        return columna
+
+
+def load_snapshot(path, cache=None):
+    """
+    Carrega una instantània desada amb save_snapshot. Retorna (video_id,
+    video_data); cache és la MetadataCache opcional del nou VideoData.
+    """
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    lector = _Lector(mm)
+
+    video_id = VideoID()
+    video_id.add_items(zip(lector.text("id.uuids"), lector.text("id.fitxers")))
+
+    uuids = lector.text("uuids")
+    columnes = {
+        "filename": lector.text("filename"),
+        "path": lector.text("path"),
+        "duration": lector.columna("duration", 'q'),
+    }
+    if lector.te("loaded"):  # les instantànies anteriors a la columna la dedueixen de la durada
+        columnes["loaded"] = lector.columna("loaded", 'B')
+    taula = lector.valors("valors")
+    for camp in CAMPS:
+        columnes[camp] = (lector.columna(camp, 'I'), taula) if camp in CAMPS_INTERNATS else lector.valors(camp)
+
+    sentits = [tuple(lector.array(f"{nom}.{part}") for part in ("indptr", "indices", "weights"))
+               for nom in (("out", "in") if lector.digraf else ("out",))]
+    csr = GrafCSR(uuids, *sentits)
+    video_data = VideoData.from_snapshot_state(uuids, columnes, csr, cache)
+    return video_id, video_data
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+MetadataCache.py : Memòria cau persistent (SQLite) dels tags dels MP4.
+
+Cada entrada es guarda per ruta real i només és vàlida si la mida i el
+mtime (en ns) del fitxer no han canviat; així un reinici només torna a
+llegir amb tinytag els fitxers nous o modificats.
+
+Les escriptures es fan per lots de max_pendents: cal tancar la memòria cau
+(close() o with) perquè l'últim lot arribi a disc. Si no es tanca, es
+buida igualment en sortir de l'intèrpret.
+"""
+import atexit
+import os
+import sqlite3
+
+COLUMNES = ("duration", "title", "album", "artist", "composer", "genre", "year", "comment")
+
+
+class MetadataCache:
+    __slots__ = ['__ruta', '__con', '__pendents', '__hits', '__misses', '__max_pendents']
+
+    def __init__(self, ruta, max_pendents=1000):
+        self.__ruta = ruta
+        self.__con = sqlite3.connect(ruta)
+        # Columnes sense tipus: SQLite conserva str, int i NULL tal com arriben
+        self.__con.execute(
+            "CREATE TABLE IF NOT EXISTS tags (path TEXT PRIMARY KEY, size INTEGER, mtime INTEGER, "
+            + ", ".join(COLUMNES) + ")")
+        self.__con.commit()
+        self.__pendents = {}  # path -> fila encara no escrita
+        self.__max_pendents = max_pendents
+        self.__hits = 0
+        self.__misses = 0
+        atexit.register(self.close)  # el lot pendent no es perd si no es tanca
+
+    @staticmethod
+    def signatura(path):
+        """ (mida, mtime_ns) del fitxer, o None si no es pot consultar. """
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def get(self, path, signatura):
+        """ Valors guardats de path si la signatura coincideix; si no, None. """
+        fila = self.__pendents.get(path)
+        if fila is None:
+            fila = self.__con.execute(
+                "SELECT size, mtime, " + ", ".join(COLUMNES) + " FROM tags WHERE path = ?",
+                (path,)).fetchone()
+        return self.__comprova(fila, signatura)
+
+    def get_many(self, entrades):
+        """
+        Versió en bloc de get per a parells (path, signatura). Retorna una
+        llista paral·lela; amb molts paths es llegeix la taula sencera d'un cop.
+        """
+        entrades = list(entrades)
+        if len(entrades) < 1000:
+            return [self.get(path, signatura) for path, signatura in entrades]
+        files = {fila[0]: fila[1:] for fila in self.__con.execute(
+            "SELECT path, size, mtime, " + ", ".join(COLUMNES) + " FROM tags")}
+        files.update(self.__pendents)
+        return [self.__comprova(files.get(path), signatura) for path, signatura in entrades]
+
+    def __comprova(self, fila, signatura):
+        if fila is None or signatura is None or tuple(fila[:2]) != tuple(signatura):
+            self.__misses += 1
+            return None
+        self.__hits += 1
+        return list(fila[2:])
+
+    def put(self, path, signatura, valors):
+        """ Guarda els valors llegits de path; s'escriuen a disc per lots. """
+        if signatura is None:
+            return
+        self.__pendents[path] = (signatura[0], signatura[1], *valors)
+        if len(self.__pendents) >= self.__max_pendents:
+            self.flush()
+
+    def flush(self):
+        if self.__pendents:
+            self.__con.executemany(
+                "INSERT OR REPLACE INTO tags VALUES (?, ?, ?, " + ", ".join("?" * len(COLUMNES)) + ")",
+                ((path, *fila) for path, fila in self.__pendents.items()))
+            self.__con.commit()
+            self.__pendents = {}
+
+    def compact(self):
+        """
+        Esborra les entrades de fitxers que ja no existeixen o que han canviat
+        i allibera l'espai del fitxer. Retorna el nombre d'entrades esborrades.
+        """
+        self.flush()
+        obsoletes = [(path,) for path, size, mtime in self.__con.execute("SELECT path, size, mtime FROM tags")
+                     if self.signatura(path) != (size, mtime)]
+        self.__con.executemany("DELETE FROM tags WHERE path = ?", obsoletes)
+        self.__con.commit()
+        self.__con.execute("VACUUM")
+        return len(obsoletes)
+
+    def stats(self):
+        """ Comptadors d'encerts/errades i mida de la memòria cau. """
+        self.flush()
+        entrades = self.__con.execute("SELECT COUNT(*) FROM tags").fetchone()[0]
+        consultes = self.__hits + self.__misses
+        return {
+            "hits": self.__hits,
+            "misses": self.__misses,
+            "hit_ratio": self.__hits / consultes if consultes else 0.0,
+            "entries": entrades,
+            "bytes": os.path.getsize(self.__ruta) if os.path.exists(self.__ruta) else 0,
+        }
+
+    def close(self):
+        atexit.unregister(self.close)
+        self.flush()
+        self.__con.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        self.flush()
+        return self.__con.execute("SELECT COUNT(*) FROM tags").fetchone()[0]
+
+    def __repr__(self):
+        return f"MetadataCache({self.__ruta!r})"
@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+"""
+MetadataStore.py : Magatzem columnar de la metadata dels vídeos.
+
+Cada uuid té una fila densa. El nom de fitxer i la ruta són columnes de
+llistes, la durada és un array('q') i els camps que es repeteixen molt
+(àlbum, artista, compositor, gènere, data) són arrays('I') d'ids dins d'una
+taula de valors internats, on un artista repetit mil vegades només es
+guarda una; cada valor compta quantes files el fan servir i surt de la
+taula quan ja no en queda cap. El títol i el comentari, gairebé sempre
+únics, són llistes.
+Per compatibilitat es comporta com un Mapping uuid -> [filename, path,
+duration, title, ...].
+"""
+from array import array
+from collections import Counter
+from collections.abc import Mapping
+from ElementData import ElementBase
+
+CAMPS = ("title", "album", "artist", "composer", "genre", "date", "comment")
+CAMPS_INTERNATS = ("album", "artist", "composer", "genre", "date")
+
+
+class MetadataStore(Mapping):
+    __slots__ = ['__files', '__uuids', '__filenames', '__paths', '__durations', '__carregats', '__ordre', '__seguent', '__tags',
+                 '__valors', '__ids_valor', '__refs', '__ids_lliures', '__lliures']
+
+    def __init__(self):
+        self.__files = {}  # uuid -> fila
+        self.__uuids = []  # fila -> uuid (None si està lliure)
+        self.__filenames = []
+        self.__paths = []
+        self.__durations = array('q')
+        self.__carregats = array('B')  # 1 si els tags venen del fitxer (no d'un #EXTINF)
+        self.__ordre = array('Q')  # número d'alta de cada fila, per tornar resultats en ordre d'inserció
+        self.__seguent = 0
+        # Camps internats: array d'ids; la resta: llista de valors
+        self.__tags = {camp: array('I') if camp in CAMPS_INTERNATS else [] for camp in CAMPS}
+        self.__valors = [""]  # taula de valors internats; l'id 0 és ""
+        self.__ids_valor = {"": 0}
+        self.__refs = [0]  # files que fan servir cada id (l'id 0 no s'allibera mai)
+        self.__ids_lliures = []  # ids sense cap fila, reutilitzables
+        self.__lliures = []  # files reutilitzables
+
+    @staticmethod
+    def __clau(valor):
+        # 1, 1.0 i True són iguals com a claus de dict: es distingeixen pel tipus
+        return valor if type(valor) is str else (type(valor), valor)
+
+    def __interna(self, valor):
+        """ Id de valor a la taula, amb una referència més. """
+        clau = self.__clau(valor)
+        i = self.__ids_valor.get(clau)
+        if i is None:
+            if self.__ids_lliures:
+                i = self.__ids_lliures.pop()
+                self.__valors[i] = valor
+            else:
+                i = len(self.__valors)
+                self.__valors.append(valor)
+                self.__refs.append(0)
+            self.__ids_valor[clau] = i
+        self.__refs[i] += 1
+        return i
+
+    def __allibera(self, i):
+        """ Treu una referència a l'id i; sense cap, el valor surt de la taula. """
+        if not i:
+            return
+        self.__refs[i] -= 1
+        if not self.__refs[i]:
+            del self.__ids_valor[self.__clau(self.__valors[i])]
+            self.__valors[i] = None
+            self.__ids_lliures.append(i)
+
+    def __buida_internats(self, fila):
+        for camp in CAMPS_INTERNATS:
+            columna = self.__tags[camp]
+            self.__allibera(columna[fila])
+            columna[fila] = 0
+
+    def add(self, uuid, filename, path):
+        """ Crea (o reinicia) la fila d'un uuid amb durada -1 i tags buits. Retorna la fila. """
+        fila = self.__files.get(uuid)
+        if fila is None:
+            if self.__lliures:
+                fila = self.__lliures.pop()
+                self.__uuids[fila] = uuid
+            else:
+                fila = len(self.__uuids)
+                self.__uuids.append(uuid)
+                self.__filenames.append(None)
+                self.__paths.append(None)
+                self.__durations.append(-1)
+                self.__carregats.append(0)
+                self.__ordre.append(0)
+                for camp, columna in self.__tags.items():
+                    columna.append(0 if camp in CAMPS_INTERNATS else "")
+            self.__files[uuid] = fila
+            self.__ordre[fila] = self.__seguent
+            self.__seguent += 1
+        self.__filenames[fila] = filename
+        self.__paths[fila] = path
+        self.__durations[fila] = -1
+        self.__carregats[fila] = 0
+        self.__buida_internats(fila)
+        for camp in CAMPS:
+            if camp not in CAMPS_INTERNATS:
+                self.__tags[camp][fila] = ""
+        return fila
+
+    def remove(self, uuid):
+        fila = self.__files.pop(uuid)
+        self.__uuids[fila] = None
+        self.__filenames[fila] = None
+        self.__paths[fila] = None
+        self.__buida_internats(fila)
+        for camp in CAMPS:
+            if camp not in CAMPS_INTERNATS:
+                self.__tags[camp][fila] = ""
+        self.__lliures.append(fila)
+
+    def set_tags(self, uuid, valors, carregat=True):
+        """
+        Guarda [durada, títol, àlbum, artista, compositor, gènere, data,
+        comentari]. carregat=False marca valors provisionals (p.ex. d'un M3U).
+        """
+        fila = self.__files[uuid]
+        self.__durations[fila] = valors[0]
+        self.__carregats[fila] = 1 if carregat else 0
+        for camp, valor in zip(CAMPS, valors[1:]):
+            columna = self.__tags[camp]
+            if camp in CAMPS_INTERNATS:
+                anterior = columna[fila]
+                columna[fila] = self.__interna(valor)  # abans d'alliberar: el mateix valor no surt de la taula
+                self.__allibera(anterior)
+            else:
+                columna[fila] = valor
+
+    def fila(self, uuid):
+        return self.__files[uuid]
+
+    def uuid(self, fila):
+        return self.__uuids[fila]
+
+    def filename(self, fila):
+        return self.__filenames[fila]
+
+    def path(self, fila):
+        return self.__paths[fila]
+
+    def duration(self, fila):
+        return self.__durations[fila]
+
+    def carregat(self, fila):
+        """ True si els tags de la fila s'han llegit del fitxer. """
+        return self.__carregats[fila] == 1
+
+    def ordena(self, uuids):
+        """ Els uuids donats en l'ordre d'alta, el mateix que iterar el magatzem. """
+        files, ordre = self.__files, self.__ordre
+        return sorted(uuids, key=lambda uuid: ordre[files[uuid]])
+
+    def tag(self, fila, camp):
+        """ Valor original (str, None, int...) d'un camp de text. """
+        if camp in CAMPS_INTERNATS:
+            return self.__valors[self.__tags[camp][fila]]
+        return self.__tags[camp][fila]
+
+    def element(self, uuid):
+        """ ElementData del graf que llegeix d'aquesta fila en lloc de copiar-la. """
+        return ElementRow(self, self.__files[uuid])
+
+    def columns(self, uuids):
+        """
+        Columnes de les files dels uuids donats, en aquest ordre: filename i
+        path (llistes), duration (array('q')), loaded (array('B') de 0/1) i
+        per a cada camp de CAMPS una llista de valors, o bé (ids, taula de
+        valors) si el camp és internat.
+        """
+        files = [self.__files[uuid] for uuid in uuids]
+        columnes = {
+            "filename": [self.__filenames[fila] for fila in files],
+            "path": [self.__paths[fila] for fila in files],
+            "duration": array('q', map(self.__durations.__getitem__, files)),
+            "loaded": array('B', map(self.__carregats.__getitem__, files)),
+        }
+        for camp in CAMPS:
+            columna = self.__tags[camp]
+            if camp in CAMPS_INTERNATS:
+                columnes[camp] = (array('I', map(columna.__getitem__, files)), self.__valors)
+            else:
+                columnes[camp] = [columna[fila] for fila in files]
+        return columnes
+
+    @classmethod
+    def from_columns(cls, uuids, columnes):
+        """
+        Magatzem amb una fila per uuid a partir del format de columns(). Els
+        ids dels camps internats han de fer referència a una mateixa taula.
+        """
+        store = cls()
+        store.__uuids = list(uuids)
+        store.__files = dict(zip(store.__uuids, range(len(store.__uuids))))
+        store.__filenames = list(columnes["filename"])
+        store.__paths = list(columnes["path"])
+        durations = columnes["duration"]
+        store.__durations = durations if isinstance(durations, array) else array('q', durations)
+        carregats = columnes.get("loaded")
+        if carregats is None:  # sense la columna, només la durada diu si s'han llegit
+            carregats = array('B', (durada != -1 for durada in store.__durations))
+        store.__carregats = carregats if isinstance(carregats, array) else array('B', carregats)
+        store.__ordre = array('Q', range(len(store.__uuids)))
+        store.__seguent = len(store.__uuids)
+        valors = columnes[CAMPS_INTERNATS[0]][1]
+        store.__valors = list(valors)
+        store.__refs = [0] * len(store.__valors)
+        for camp in CAMPS:
+            if camp in CAMPS_INTERNATS:
+                ids = columnes[camp][0]
+                store.__tags[camp] = ids if isinstance(ids, array) else array('I', ids)
+                for i, n in Counter(store.__tags[camp]).items():
+                    store.__refs[i] += n
+            else:
+                store.__tags[camp] = list(columnes[camp])
+        # Només els valors amb alguna fila: la taula pot portar forats d'ids alliberats
+        store.__ids_valor = {"": 0}
+        store.__ids_lliures = []
+        for i in range(1, len(store.__valors)):
+            if store.__refs[i]:
+                store.__ids_valor[cls.__clau(store.__valors[i])] = i
+            else:
+                store.__valors[i] = None
+                store.__ids_lliures.append(i)
+        return store
+
+    @property
+    def rows(self):
+        """ Diccionari uuid -> fila (no s'ha de modificar); útil per a proves de pertinença. """
+        return self.__files
+
+    # Mapping: uuid -> [filename, path, duration, title, album, artist, composer, genre, date, comment]
+    def __getitem__(self, uuid):
+        fila = self.__files[uuid]
+        return [self.__filenames[fila], self.__paths[fila], self.__durations[fila]] + \
+            [self.tag(fila, camp) for camp in CAMPS]
+
+    def __contains__(self, uuid):
+        return uuid in self.__files
+
+    def __iter__(self):
+        return iter(self.__files)
+
+    def __len__(self):
+        return len(self.__files)
+
+    def keys(self):
+        return self.__files.keys()
+
+    def __repr__(self):
+        return f"MetadataStore({len(self.__files)} files, {len(self.__valors) - len(self.__ids_lliures)} valors internats)"
+
+
+class ElementRow(ElementBase):
+    """
+    Vista d'ElementData que és només una referència (magatzem, fila): els
+    atributs es llegeixen del MetadataStore i no es dupliquen al graf. No
+    hereta d'ElementData perquè cada fila no carregui els seus nou slots.
+    """
+    __slots__ = ['__store', '__fila']
+
+    def __init__(self, store, fila):
+        self.__store = store
+        self.__fila = fila
+
+    def __valor(self, camp):
+        return self.__store.tag(self.__fila, camp)
+
+    def __no_modificable(self, value):
+        raise ValueError("ERROR: No modificable, s'actualitza des de VideoData")
+
+    title = property(lambda self: self.__valor("title"), __no_modificable)
+    artist = property(lambda self: self.__valor("artist"), __no_modificable)
+    album = property(lambda self: self.__valor("album"), __no_modificable)
+    composer = property(lambda self: self.__valor("composer"), __no_modificable)
+    genre = property(lambda self: self.__valor("genre"), __no_modificable)
+    date = property(lambda self: self.__valor("date"), __no_modificable)
+    comment = property(lambda self: self.__valor("comment"), __no_modificable)
+    duration = property(lambda self: self.__store.duration(self.__fila), __no_modificable)
+    filename = property(lambda self: self.__store.filename(self.__fila), __no_modificable)
+
+    def __repr__(self):
+        return f"ElementData(title={self.title}, artist={self.artist}, album={self.album}, filename={self.filename})"
+
+    def __str__(self):
+        return f"ElementData(title={self.title}, artist={self.artist}, filename={self.filename})"
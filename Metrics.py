@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""
+Metrics.py : Instrumentació opcional dels camins crítics.
+
+Desactivada per defecte: les funcions decorades amb @timed només consulten
+un booleà abans de cridar l'original, i els recorreguts del graf només
+compten vèrtexs i arestes si està activa. Amb enable() cada operació acumula
+crides, temps total, una finestra de les darreres durades (per als
+percentils) i, si escau, vèrtexs i arestes visitats.
+
+    import Metrics
+    Metrics.enable()
+    ...
+    Metrics.stats()                  # instantània en un dict
+    Metrics.dump_prometheus("m.prom")  # format de text de Prometheus
+    with Metrics.profile("autoplay.prof"):
+        search.get_auto_play(10)     # cProfile només d'aquesta crida
+"""
+import cProfile
+import functools
+import os
+import threading
+import time
+from collections import deque
+
+# Durades guardades per operació per calcular-ne els percentils
+FINESTRA = 2048
+PERCENTILS = (0.5, 0.9, 0.99)
+PREFIX = "edvideo"
+
+_actiu = False
+_lock = threading.Lock()
+_operacions = {}  # nom -> _Operacio
+_comptadors = {}  # nom -> valor
+
+
+class _Operacio:
+    __slots__ = ['crides', 'total', 'maxim', 'durades', 'vertexs', 'arestes']
+
+    def __init__(self):
+        self.crides = 0
+        self.total = 0.0
+        self.maxim = 0.0
+        self.durades = deque(maxlen=FINESTRA)
+        self.vertexs = 0
+        self.arestes = 0
+
+
+def _operacio(nom):
+    operacio = _operacions.get(nom)
+    if operacio is None:
+        operacio = _operacions.setdefault(nom, _Operacio())
+    return operacio
+
+
+def enable():
+    """ Activa la recollida de mètriques. """
+    global _actiu
+    _actiu = True
+
+
+def disable():
+    """ Desactiva la recollida; el que ja s'ha recollit es conserva. """
+    global _actiu
+    _actiu = False
+
+
+def is_enabled():
+    return _actiu
+
+
+def reset():
+    """ Esborra totes les mètriques recollides. """
+    with _lock:
+        _operacions.clear()
+        _comptadors.clear()
+
+
+def record(nom, segons):
+    """ Afegeix una durada a l'operació nom. """
+    with _lock:
+        operacio = _operacio(nom)
+        operacio.crides += 1
+        operacio.total += segons
+        if segons > operacio.maxim:
+            operacio.maxim = segons
+        operacio.durades.append(segons)
+
+
+def traversal(nom, vertexs, arestes):
+    """ Suma els vèrtexs expandits i les arestes examinades per un recorregut. """
+    if not _actiu:
+        return
+    with _lock:
+        operacio = _operacio(nom)
+        operacio.vertexs += vertexs
+        operacio.arestes += arestes
+
+
+def count(nom, n=1):
+    """ Incrementa el comptador nom (no fa res si està desactivat). """
+    if not _actiu:
+        return
+    with _lock:
+        _comptadors[nom] = _comptadors.get(nom, 0) + n
+
+
+def timed(nom):
+    """ Decorador: compta i cronometra cada crida sota el nom donat. """
+    def decora(funcio):
+        @functools.wraps(funcio)
+        def embolcall(*args, **kwargs):
+            if not _actiu:
+                return funcio(*args, **kwargs)
+            t0 = time.perf_counter()
+            try:
+                return funcio(*args, **kwargs)
+            finally:
+                record(nom, time.perf_counter() - t0)
+        return embolcall
+    return decora
+
+
+def _percentil(ordenades, q):
+    if not ordenades:
+        return 0.0
+    return ordenades[min(int(q * len(ordenades)), len(ordenades) - 1)]
+
+
+def stats():
+    """
+    Instantània de les mètriques: {"operacions": {nom: {...}}, "comptadors":
+    {nom: valor}}. Els percentils són de les darreres FINESTRA crides.
+    """
+    with _lock:
+        operacions = {nom: (op.crides, op.total, op.maxim, sorted(op.durades), op.vertexs, op.arestes)
+                      for nom, op in _operacions.items()}
+        comptadors = dict(_comptadors)
+    resultat = {}
+    for nom, (crides, total, maxim, ordenades, vertexs, arestes) in sorted(operacions.items()):
+        fila = {"crides": crides, "total_s": total, "mitjana_s": total / crides if crides else 0.0,
+                "max_s": maxim}
+        for q in PERCENTILS:
+            fila[f"p{round(q * 100)}_s"] = _percentil(ordenades, q)
+        if vertexs or arestes:
+            fila["vertexs"] = vertexs
+            fila["arestes"] = arestes
+        resultat[nom] = fila
+    return {"operacions": resultat, "comptadors": dict(sorted(comptadors.items()))}
+
+
+def prometheus_text():
+    """ Les mètriques en el format d'exposició de text de Prometheus. """
+    instantania = stats()
+    operacions = instantania["operacions"]
+    linies = [f"# HELP {PREFIX}_operation_seconds Durada de les operacions instrumentades.",
+              f"# TYPE {PREFIX}_operation_seconds summary"]
+    for nom, fila in operacions.items():
+        if not fila["crides"]:
+            continue  # només recorreguts, sense temps
+        for q in PERCENTILS:
+            linies.append(f'{PREFIX}_operation_seconds{{op="{nom}",quantile="{q}"}} {fila[f"p{round(q * 100)}_s"]!r}')
+        linies.append(f'{PREFIX}_operation_seconds_sum{{op="{nom}"}} {fila["total_s"]!r}')
+        linies.append(f'{PREFIX}_operation_seconds_count{{op="{nom}"}} {fila["crides"]}')
+    for metrica, camp, ajuda in (("vertices_visited_total", "vertexs", "Vèrtexs expandits pels recorreguts."),
+                                 ("edges_visited_total", "arestes", "Arestes examinades pels recorreguts.")):
+        files = [(nom, fila[camp]) for nom, fila in operacions.items() if camp in fila]
+        if files:
+            linies.append(f"# HELP {PREFIX}_{metrica} {ajuda}")
+            linies.append(f"# TYPE {PREFIX}_{metrica} counter")
+            linies.extend(f'{PREFIX}_{metrica}{{op="{nom}"}} {valor}' for nom, valor in files)
+    if instantania["comptadors"]:
+        linies.append(f"# HELP {PREFIX}_events_total Comptadors d'esdeveniments.")
+        linies.append(f"# TYPE {PREFIX}_events_total counter")
+        linies.extend(f'{PREFIX}_events_total{{name="{nom}"}} {valor}'
+                      for nom, valor in instantania["comptadors"].items())
+    return "\n".join(linies) + "\n"
+
+
+def dump_prometheus(path):
+    """ Escriu prometheus_text() a path (p.ex. per al textfile collector de node_exporter). """
+    temporal = f"{path}.tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        f.write(prometheus_text())
+    os.replace(temporal, path)
+
+
+class profile:
+    """
+    Context que captura un perfil de cProfile del bloc (una sola petició).
+    Amb path es desa en format pstats en sortir; l'objecte Profile queda a
+    l'atribut profiler per inspeccionar-lo.
+    """
+    __slots__ = ['path', 'profiler']
+
+    def __init__(self, path=None):
+        self.path = path
+        self.profiler = cProfile.Profile()
+
+    def __enter__(self):
+        self.profiler.enable()
+        return self.profiler
+
+    def __exit__(self, *exc):
+        self.profiler.disable()
+        if self.path is not None:
+            self.profiler.dump_stats(self.path)
+        return False
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+NGramIndex.py : Índex invertit de n-grames per a cerques de subcadena.
+
+Cada text es guarda en minúscules i es trosseja en n-grames; cada n-grama
+apunta al conjunt d'uuids que el contenen. Una cerca intersecta les llistes
+dels n-grames de la subcadena, començant per la més curta, i verifica els
+candidats amb `in`, de manera que la semàntica és la mateixa que
+`sub.lower() in text.lower()`.
+"""
+
+
+class NGramIndex:
+    __slots__ = ['__n', '__textos', '__postings']
+
+    def __init__(self, n=3):
+        self.__n = n
+        self.__textos = {}  # uuid -> text en minúscules
+        self.__postings = {}  # n-grama -> set(uuid)
+
+    def __grams(self, text):
+        n = self.__n
+        return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+    def add(self, uuid, value):
+        """ Indexa (o reindexa) str(value) d'un uuid. Els textos buits no s'indexen. """
+        self.remove(uuid)
+        text = str(value).lower()
+        if not text:
+            return
+        self.__textos[uuid] = text
+        for gram in self.__grams(text):
+            self.__postings.setdefault(gram, set()).add(uuid)
+
+    def remove(self, uuid):
+        text = self.__textos.pop(uuid, None)
+        if text is None:
+            return
+        for gram in self.__grams(text):
+            posting = self.__postings[gram]
+            posting.discard(uuid)
+            if not posting:
+                del self.__postings[gram]
+
+    def __llistes(self, sub):
+        """ Llistes de postings dels n-grames de sub, de més curta a més llarga. """
+        llistes = []
+        for gram in self.__grams(sub):
+            posting = self.__postings.get(gram)
+            if posting is None:
+                return None  # algun n-grama no apareix: cap coincidència
+            llistes.append(posting)
+        llistes.sort(key=len)
+        return llistes
+
+    def search(self, sub):
+        """ Conjunt d'uuids el text dels quals conté sub (sense distingir majúscules). """
+        sub = sub.lower()
+        if len(sub) < self.__n:
+            # Massa curta per tenir n-grames: es recorren els textos indexats
+            return {uuid for uuid, text in self.__textos.items() if sub in text}
+        llistes = self.__llistes(sub)
+        if llistes is None:
+            return set()
+        candidats = set(llistes[0])
+        for posting in llistes[1:]:
+            candidats &= posting
+            if not candidats:
+                return candidats
+        textos = self.__textos
+        return {uuid for uuid in candidats if sub in textos[uuid]}
+
+    def estimate(self, sub):
+        """ Cota superior barata del nombre de coincidències de sub. """
+        sub = sub.lower()
+        if len(sub) < self.__n:
+            return len(self.__textos)
+        llistes = self.__llistes(sub)
+        return 0 if llistes is None else len(llistes[0])
+
+    def matches(self, uuid, sub):
+        """ Comprova un sol uuid sense passar per les llistes. """
+        text = self.__textos.get(uuid)
+        return text is not None and sub.lower() in text
+
+    def __len__(self):
+        return len(self.__textos)
+
+    def __contains__(self, uuid):
+        return uuid in self.__textos
+
+    def __repr__(self):
+        return f"NGramIndex(n={self.__n}, textos={len(self.__textos)}, grams={len(self.__postings)})"
@@ -4,15 +4,54 @@
 import cfg 
 import os.path
 import sys
-import numpy 
-import uuid
-import vlc
 import time 
 import os
+import math
 from VideoID import VideoID  # Asegúrate de que la ruta sea correcta
 from VideoPlayer import VideoPlayer  # Asegúrate de que la ruta sea correcta
 
 
+def parteix_extinf(text: str):
+    """Separa '<segundos> [atributos],<título>' por la primera coma fuera de comillas."""
+    entre_cometes = False
+    for i, caracter in enumerate(text):
+        if caracter == '"':
+            entre_cometes = not entre_cometes
+        elif caracter == "," and not entre_cometes:
+            return text[:i], text[i + 1:]
+    return text, ""
+
+
+def llegeix_m3u(file: str):
+    """
+    Generador de las entradas (ruta, duración, título) de un M3U, línea a
+    línea y sin cargar el fichero. La duración y el título vienen del
+    #EXTINF que precede a la ruta (None si no hay o si la duración es -1).
+    """
+    durada, titol = None, None
+    with open(file, "r", errors='ignore') as fitxer:
+        for linia in fitxer:
+            linia = linia.strip()
+            if not linia:
+                continue
+            if linia.startswith("#"):
+                if linia.startswith("#EXTINF:"):
+                    # #EXTINF:<segundos> [atributos],<título>
+                    info, titol = parteix_extinf(linia[len("#EXTINF:"):])
+                    titol = titol.strip() or None
+                    try:
+                        durada = math.ceil(float(info.split(maxsplit=1)[0]))
+                    except (ValueError, IndexError, OverflowError):
+                        durada = None
+                    if durada is not None and durada < 0:
+                        durada = None
+                # #EXTM3U y el resto de directivas no afectan a las rutas
+                continue
+            if linia.endswith(".mp4"):
+                yield linia, durada, titol
+            durada, titol = None, None
+
+
 class PlayList:
     __slots__ = ['__videoid', '__videoplayer', '__playlist']
 
@@ -33,17 +72,26 @@ class PlayList:
         self.__playlist = []
         if not file.endswith(".m3u"):
             return
-                    
-        with open(file, "r", errors='ignore') as fitxer:
-            for linia in fitxer:
-                linia = linia.strip()
-                if linia and not linia.startswith("#") and linia.endswith(".mp4"):
-                    uuid = self.__videoid.get_uuid(linia)
-                    if uuid and uuid not in self.__playlist:
-                        self.__playlist.append(uuid)
-        
+        self.__playlist = list(self.iter_file(file))
         return self.__playlist
 
+    def iter_file(self, file: str, hints=None):
+        """
+        Generador de los UUIDs de un M3U en orden y sin repetir, sin
+        materializar la lista. Si se pasa un dict hints, se rellena con
+        uuid -> (duración, título) de los #EXTINF para VideoData.set_hints.
+        """
+        if not file.endswith(".m3u"):
+            return
+        vistos = set()
+        for linia, durada, titol in llegeix_m3u(file):
+            uuid = self.__videoid.get_uuid(linia)
+            if uuid and uuid not in vistos:
+                vistos.add(uuid)
+                if hints is not None and (durada is not None or titol is not None):
+                    hints[uuid] = (durada, titol)
+                yield uuid
+
     def read_list(self, p_llista: list):
         """Cargar vídeos desde una lista de UUIDs únicos."""
         self.__playlist = [uuid for uuid in p_llista if uuid not in self.__playlist]
@@ -53,11 +101,26 @@ class PlayList:
         if not isinstance(mode, int):
             raise TypeError(f"El modo debe ser un entero, recibido: {type(mode)}")
         if self.__playlist:
-            for uuid in self.__playlist:
+            seguents = self.__playlist[1:] + [None]
+            for uuid, seguent in zip(self.__playlist, seguents):
                 try:
-                    self.__videoplayer.play_video(uuid, mode)
+                    self.__videoplayer.play_video(uuid, mode, seguent)
                 except Exception as e:
                     print(f"Error al reproducir video {uuid}: {e}")
+            self.__videoplayer.release_prefetched()
+
+    async def play_async(self, backend=None, escala=1.0):
+        """
+        Reproduce la lista con un PlaybackScheduler (sin bloquear el bucle de
+        asyncio) y lo devuelve al terminar. backend por defecto: el del VideoPlayer.
+        """
+        from PlaybackScheduler import PlaybackScheduler
+        if backend is None:
+            backend = self.__videoplayer.backend  # el mismo VlcListBackend que play()
+        scheduler = PlaybackScheduler(self.__videoplayer.video_data, backend, escala)
+        scheduler.enqueue(self.__playlist)
+        await scheduler.play()
+        return scheduler
 
     def add_video_at_end(self, uuid: str):
         self.__playlist.append(uuid)
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+PlaybackScheduler.py : Planificador de reproducció asíncron (asyncio).
+
+La durada de cada vídeo surt de VideoData, sense tornar a llegir el fitxer.
+Mentre un element es reprodueix, el següent de la cua ja s'obre en un fil
+(PlayerBackend.open), de manera que el canvi és immediat. enqueue(), skip()
+i stop() no bloquegen: es poden cridar des del mateix bucle d'esdeveniments
+mentre play() s'executa, o des d'un altre fil amb loop.call_soon_threadsafe.
+"""
+import asyncio
+from collections import deque
+from VideoData import VideoData
+from PlayerBackend import PlayerBackend, VlcListBackend
+
+
+class PlaybackScheduler:
+    __slots__ = ['__video_data', '__backend', '__escala', '__cua', '__actual', '__precarrega',
+                 '__salta', '__atura', '__tasca', '__reproduits']
+
+    def __init__(self, video_data, backend=None, escala=1.0):
+        """ escala multiplica les durades (p.ex. 0.001 per provar amb StubBackend). """
+        if not isinstance(video_data, VideoData):
+            raise NotImplementedError("Se requiere una instancia válida de VideoData.")
+        if backend is None:
+            backend = VlcListBackend()
+        if not isinstance(backend, PlayerBackend):
+            raise NotImplementedError("Se requiere una instancia válida de PlayerBackend.")
+        self.__video_data = video_data
+        self.__backend = backend
+        self.__escala = escala
+        self.__cua = deque()
+        self.__actual = None
+        self.__precarrega = None  # (uuid, tasca d'open) del següent element
+        self.__salta = asyncio.Event()
+        self.__atura = False
+        self.__tasca = None
+        self.__reproduits = []
+
+    def enqueue(self, uuids):
+        """ Afegeix un uuid o un iterable d'uuids al final de la cua. """
+        if isinstance(uuids, str):
+            uuids = [uuids]
+        self.__cua.extend(uuids)
+        if self.__actual is not None:
+            self.__precarrega_seguent()
+
+    def skip(self):
+        """ Acaba l'element actual i passa al següent. """
+        self.__salta.set()
+
+    def stop(self):
+        """ Atura la reproducció; la resta de la cua es conserva. """
+        self.__atura = True
+        self.__salta.set()
+
+    def play(self):
+        """
+        Comença a buidar la cua en una tasca del bucle actual i la retorna;
+        es pot esperar (await) per saber quan s'ha acabat.
+        """
+        if self.__tasca is None or self.__tasca.done():
+            self.__atura = False
+            self.__tasca = asyncio.get_running_loop().create_task(self.__bucle())
+        return self.__tasca
+
+    @property
+    def current(self):
+        """ uuid que s'està reproduint, o None. """
+        return self.__actual
+
+    @property
+    def queue(self):
+        """ Còpia dels uuids pendents. """
+        return list(self.__cua)
+
+    @property
+    def played(self):
+        """ uuids reproduïts (o saltats) en ordre. """
+        return list(self.__reproduits)
+
+    def __path(self, uuid):
+        if not self.__video_data.existeix_uuid(uuid):
+            print(f"UUID no encontrado: {uuid}")
+            return None
+        return self.__video_data.get_path(uuid)
+
+    def __precarrega_seguent(self):
+        """ Obre en un fil el primer element de la cua si encara no s'ha fet. """
+        if self.__precarrega is not None or not self.__cua:
+            return
+        uuid = self.__cua[0]
+        if self.__video_data.existeix_uuid(uuid):  # l'error dels desconeguts ja sortirà en arribar-hi
+            path = self.__video_data.get_path(uuid)
+            self.__precarrega = (uuid, asyncio.ensure_future(asyncio.to_thread(self.__backend.open, path)))
+
+    async def __obre(self, uuid):
+        """ Handle de uuid: el precarregat si és aquest, si no s'obre ara. """
+        precarrega, self.__precarrega = self.__precarrega, None
+        if precarrega is not None:
+            uuid_precarregat, tasca = precarrega
+            if uuid_precarregat == uuid:
+                return await tasca
+            await self.__descarta(tasca)
+        path = self.__path(uuid)
+        if path is None:
+            return None
+        return await asyncio.to_thread(self.__backend.open, path)
+
+    async def __descarta(self, tasca):
+        """ Allibera un element precarregat que ja no es farà servir. """
+        try:
+            handle = await tasca
+        except Exception as e:
+            print(f"Error al abrir el siguiente video: {e}")
+            return
+        self.__backend.stop(handle)
+
+    def __durada(self, uuid, handle):
+        durada = self.__video_data.get_duration(uuid)
+        if durada is None or durada < 0:
+            durada = self.__backend.duration(handle) or 0  # sense metadata: la del motor
+        return durada * self.__escala
+
+    async def __bucle(self):
+        try:
+            while self.__cua and not self.__atura:
+                uuid = self.__cua.popleft()
+                try:
+                    handle = await self.__obre(uuid)
+                except Exception as e:
+                    print(f"Error al reproducir video {uuid}: {e}")
+                    continue
+                if handle is None:
+                    continue
+                self.__actual = uuid
+                self.__salta.clear()
+                self.__backend.play(handle)
+                self.__precarrega_seguent()
+                try:
+                    await asyncio.wait_for(self.__salta.wait(), self.__durada(uuid, handle))
+                except asyncio.TimeoutError:
+                    pass
+                finally:
+                    self.__backend.stop(handle)
+                    self.__reproduits.append(uuid)
+                    self.__actual = None
+        finally:
+            if self.__precarrega is not None:
+                await self.__descarta(self.__precarrega[1])
+                self.__precarrega = None
+
+    def __repr__(self):
+        return f"PlaybackScheduler(current={self.__actual}, queue={len(self.__cua)})"
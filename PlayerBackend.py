@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+PlayerBackend.py : Motors de reproducció intercanviables.
+
+Un motor sap obrir un fitxer (que el deixa preparat per començar sense
+espera), reproduir-lo i aturar-lo; no sap res del catàleg ni del temps.
+PlaybackScheduler i VideoPlayer decideixen quan es crida cada operació.
+VlcListBackend (el motor per defecte) i VlcBackend fan servir libvlc, que
+només s'importa en crear el motor; StubBackend no reprodueix res i registra
+les crides, per a proves i mesures sense libvlc.
+"""
+import threading
+import time
+
+
+class PlayerBackend:
+    """ Interfície dels motors. open() pot ser lent i es crida des d'un fil. """
+    __slots__ = []
+
+    def open(self, path):
+        """ Prepara path per reproduir-lo i retorna un identificador opac. """
+        raise NotImplementedError
+
+    def play(self, handle):
+        """ Comença a reproduir un element obert; no bloqueja. """
+        raise NotImplementedError
+
+    def stop(self, handle):
+        """ Atura l'element (si es reprodueix) i n'allibera els recursos. """
+        raise NotImplementedError
+
+    def duration(self, handle):
+        """ Durada en segons segons el motor, o None si no la coneix. """
+        return None
+
+    def close(self):
+        """ Allibera els recursos del motor. """
+
+
+class VlcBackend(PlayerBackend):
+    """ Un MediaPlayer de libvlc per element, creat i analitzat a open(). """
+    __slots__ = ['__instance']
+
+    def __init__(self, *args):
+        import vlc  # només qui reprodueix necessita libvlc
+        self.__instance = vlc.Instance(*args)
+
+    def open(self, path):
+        media = self.__instance.media_new(path)
+        media.parse()  # llegeix capçaleres i durada abans que toqui reproduir-lo
+        player = self.__instance.media_player_new()
+        player.set_media(media)
+        return player
+
+    def play(self, handle):
+        handle.play()
+
+    def stop(self, handle):
+        handle.stop()
+        handle.release()
+
+    def duration(self, handle):
+        durada = handle.get_media().get_duration()
+        return durada / 1000 if durada and durada > 0 else None
+
+    def close(self):
+        self.__instance.release()
+
+
+class VlcListBackend(PlayerBackend):
+    """
+    Un sol vlc.Instance i un MediaListPlayer per a tota la sessió. open()
+    crea i analitza el Media i el guarda en un petit pool (els dels propers
+    uuids), de manera que play() només ha d'afegir-lo a la llista i saltar-hi,
+    sense inicialitzar libvlc ni un reproductor nou. Cada Media porta un
+    comptador de referències (una pel pool i una per cada open() pendent de
+    stop()) i només s'allibera quan arriba a zero: treure'l del pool no
+    invalida un handle que encara té PlaybackScheduler o VideoPlayer.
+    """
+    __slots__ = ['__instance', '__llista', '__player', '__pool', '__mida_pool', '__refs', '__actual', '__lock']
+
+    def __init__(self, *args, pool=4):
+        import vlc  # només qui reprodueix necessita libvlc
+        self.__instance = vlc.Instance(*args)
+        self.__llista = self.__instance.media_list_new()
+        self.__player = self.__instance.media_list_player_new()
+        self.__player.set_media_list(self.__llista)
+        self.__pool = {}  # path -> Media ja analitzat, en ordre d'obertura
+        self.__mida_pool = pool
+        self.__refs = {}  # id(Media) -> referències vives
+        self.__actual = None
+        self.__lock = threading.Lock()  # open() es crida des d'un fil
+
+    def __agafa(self, media):
+        self.__refs[id(media)] = self.__refs.get(id(media), 0) + 1
+
+    def __deixa(self, media):
+        """ Treu una referència; True si era l'última i cal alliberar-lo. """
+        refs = self.__refs[id(media)] - 1
+        if refs:
+            self.__refs[id(media)] = refs
+            return False
+        del self.__refs[id(media)]
+        return True
+
+    def __treu_del_pool(self, handle):
+        """ Treu handle del pool (sense el lock); True si hi era. """
+        for path, media in self.__pool.items():
+            if media is handle:
+                del self.__pool[path]
+                return True
+        return False
+
+    def open(self, path):
+        with self.__lock:
+            media = self.__pool.get(path)
+            if media is not None:
+                self.__agafa(media)  # la referència de qui l'obre
+                self.__pool[path] = self.__pool.pop(path)  # el més recent
+                return media
+        media = self.__instance.media_new(path)
+        media.parse()
+        alliberar = []
+        with self.__lock:
+            self.__agafa(media)  # la de qui l'obre
+            if path not in self.__pool:
+                self.__agafa(media)  # la del pool
+                self.__pool[path] = media
+            while len(self.__pool) > self.__mida_pool:
+                vell = self.__pool.pop(next(iter(self.__pool)))
+                if self.__deixa(vell):
+                    alliberar.append(vell)
+        for vell in alliberar:
+            vell.release()
+        return media
+
+    def play(self, handle):
+        with self.__lock:
+            # El Media passa a ser de qui el reprodueix
+            if self.__treu_del_pool(handle):
+                self.__deixa(handle)  # mai és l'última: qui l'ha obert encara la té
+        self.__llista.lock()
+        try:
+            if self.__llista.index_of_item(handle) < 0:
+                self.__llista.add_media(handle)
+        finally:
+            self.__llista.unlock()
+        self.__actual = handle
+        self.__player.play_item(handle)
+
+    def stop(self, handle):
+        if self.__actual is handle:
+            self.__player.stop()
+            self.__actual = None
+        with self.__lock:
+            # Si encara és al pool (obert però no reproduït) s'hi queda per reutilitzar-lo
+            if not self.__deixa(handle):
+                return
+        self.__llista.lock()
+        try:
+            index = self.__llista.index_of_item(handle)
+            if index >= 0:
+                self.__llista.remove_index(index)
+        finally:
+            self.__llista.unlock()
+        handle.release()
+
+    def duration(self, handle):
+        durada = handle.get_duration()
+        return durada / 1000 if durada and durada > 0 else None
+
+    def close(self):
+        with self.__lock:
+            mitjans, self.__pool = list(self.__pool.values()), {}
+            alliberar = [media for media in mitjans if self.__deixa(media)]
+        for media in alliberar:
+            media.release()
+        self.__player.release()
+        self.__llista.release()
+        self.__instance.release()
+
+
+class StubBackend(PlayerBackend):
+    """
+    Motor fals que no reprodueix res. Cada crida s'afegeix a events com
+    (instant, operació, path); open_delay simula el cost d'obrir un fitxer,
+    que com a VlcListBackend només es paga un cop fins que s'atura.
+    """
+    __slots__ = ['__open_delay', '__durades', '__oberts', 'events']
+
+    def __init__(self, open_delay=0.0, durades=None):
+        self.__open_delay = open_delay
+        self.__durades = durades or {}  # path -> durada que retornarà duration()
+        self.__oberts = set()
+        self.events = []
+
+    def __registra(self, operacio, path):
+        self.events.append((time.perf_counter(), operacio, path))
+
+    def open(self, path):
+        if self.__open_delay and path not in self.__oberts:
+            time.sleep(self.__open_delay)
+        self.__oberts.add(path)
+        self.__registra("open", path)
+        return path
+
+    def play(self, handle):
+        self.__registra("play", handle)
+
+    def stop(self, handle):
+        self.__oberts.discard(handle)
+        self.__registra("stop", handle)
+
+    def duration(self, handle):
+        return self.__durades.get(handle)
+
+    def __repr__(self):
+        return f"StubBackend({len(self.events)} events)"
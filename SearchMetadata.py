@@ -6,10 +6,12 @@ SearchMetadata.py : Clase SearchMetadata con `__slots__` y mejoras.
 import cfg
 import os
 import sys
-import tinytag
-import numpy
+import heapq
+import Metrics
 from VideoData import VideoData
 
+CRITERIS_TEXT = {"title", "album", "artist", "composer", "genre", "date", "comment"}
+
 class SearchMetadata:
     __slots__ = ['__video_data']
 
@@ -22,6 +24,7 @@ class SearchMetadata:
     def video_data(self):
         return self.__video_data
 
+    @Metrics.timed("searchmetadata_filter_by_attribute")
     def filter_by_attribute(self, attribute_getter, sub):
         result = []
         for uuid in self.video_data.metadata.keys():
@@ -34,34 +37,36 @@ class SearchMetadata:
                 continue
         return result
 
+    @Metrics.timed("searchmetadata_duration")
     def duration(self, min_duration, max_duration):
         """Filtra videos por duración dentro de un rango."""
-        return [
-            uuid for uuid in self.video_data.metadata.keys()
-            if (duration := self.video_data.get_duration(uuid)) is not None and min_duration <= duration <= max_duration
-        ]
+        return self.video_data.search_duration(min_duration, max_duration)
+
+    def count_duration(self, min_duration, max_duration):
+        """Cuenta los videos dentro de un rango de duración sin construir la lista."""
+        return self.video_data.count_duration(min_duration, max_duration)
 
     def title(self, sub):
-        return self.filter_by_attribute(self.video_data.get_title, sub)
+        return self.video_data.search_text("title", sub)
 
 
     def album(self, sub):
-        return self.filter_by_attribute(self.video_data.get_album, sub)
+        return self.video_data.search_text("album", sub)
 
     def artist(self, sub):
-        return self.filter_by_attribute(self.video_data.get_artist, sub)
+        return self.video_data.search_text("artist", sub)
 
     def composer(self, sub):
-        return self.filter_by_attribute(self.video_data.get_composer, sub)
+        return self.video_data.search_text("composer", sub)
 
     def genre(self, sub):
-        return self.filter_by_attribute(self.video_data.get_genre, sub)
+        return self.video_data.search_text("genre", sub)
 
     def date(self, sub):
-        return self.filter_by_attribute(lambda uuid: str(self.video_data.get_date(uuid)), sub)
+        return self.video_data.search_text("date", sub)
 
     def comment(self, sub):
-        return self.filter_by_attribute(self.video_data.get_comment, sub)
+        return self.video_data.search_text("comment", sub)
 
     def and_operator(self, list1, list2):
         """Operador lógico AND que retorna la intersección de dos listas."""
@@ -100,53 +105,125 @@ class SearchMetadata:
     def __str__(self):
         return f"VideoID managing {len(self)} UUIDs"
 
+    @Metrics.timed("searchmetadata_get_similar")
     def get_similar(self, uuid: str, max_list: int) -> list:
-        similarities = []
-        for other_uuid in self.__video_data:
-            if uuid == other_uuid:
-                continue
-            AB_nodes, AB_value = self.__video_data.get_video_distance(uuid, other_uuid)
-            BA_nodes, BA_value = self.__video_data.get_video_distance(other_uuid, uuid)
-
-            AB_sim = (AB_value / AB_nodes) * (self.__video_data.get_video_rank(uuid) / 2) if AB_nodes > 0 else 0
+        return self.__similars(uuid, min(max_list, 25))
+
+    @Metrics.timed("searchmetadata_get_similar_approx")
+    def get_similar_approx(self, uuid: str, max_list: int, max_salts=2, max_pes=None):
+        """
+        Versión aproximada de get_similar: los recorridos (de salida y de
+        entrada) solo exploran los vídeos a como mucho max_salts aristas y/o
+        max_pes de peso, y solo esos pueden salir en la lista: puede tener
+        menos de max_list vídeos. Devuelve (lista, vértices expandidos), y el
+        coste depende del vecindario de uuid en vez del tamaño de la biblioteca.
+        """
+        video_data = self.__video_data
+        forward, expandits = video_data.get_video_distances_local(uuid, max_salts=max_salts, max_pes=max_pes)
+        backward = forward
+        if video_data.es_digraf():
+            backward, expandits_in = video_data.get_video_distances_local(uuid, invers=True, max_salts=max_salts,
+                                                                         max_pes=max_pes)
+            expandits += expandits_in
+        return self.__similars(uuid, min(max_list, 25), forward, backward, completa=False), expandits
+
+    def __similars(self, uuid, limit, forward=None, backward=None, completa=True):
+        """
+        Los `limit` vídeos más similares a uuid ordenados por (-similitud, uuid).
+        Solo los alcanzables en algún sentido pueden puntuar; si no llegan a
+        limit, se completa con los de similitud 0 por uuid, como haría
+        ordenar la lista entera. Con completa=False los de similitud 0 salen
+        solo de forward y backward, sin recorrer toda la biblioteca.
+        """
+        # Dos recorridos (salida y entrada) dan todas las distancias AB y BA
+        if forward is None:
+            forward = self.__video_data.get_video_distances(uuid)
+        if backward is None:
+            # En un grafo no dirigido el recorrido de entrada es el mismo que el de salida
+            dirigit = self.__video_data.es_digraf()
+            backward = self.__video_data.get_video_distances(uuid, invers=True) if dirigit else forward
+        rank_uuid = self.__video_data.get_video_rank(uuid)
+
+        similarities = {}
+        for other_uuid in forward.keys() | backward.keys():
+            AB_nodes, AB_value = forward.get(other_uuid, (0, 0))
+            BA_nodes, BA_value = backward.get(other_uuid, (0, 0))
+
+            AB_sim = (AB_value / AB_nodes) * (rank_uuid / 2) if AB_nodes > 0 else 0
             BA_sim = (BA_value / BA_nodes) * (self.__video_data.get_video_rank(other_uuid) / 2) if BA_nodes > 0 else 0
 
             similarity = AB_sim + BA_sim
-            similarities.append((similarity, other_uuid))
-
-        similarities.sort(key=lambda x: (-x[0], x[1]))
-        return [uuid for _, uuid in similarities[:min(max_list, 25)]]
+            if similarity != 0:
+                similarities[other_uuid] = similarity
+
+        candidats = self.__video_data if completa else forward.keys() | backward.keys()
+        if limit < 0:  # slicing con negativo: todos menos los últimos
+            todos = [(-similarities.get(other, 0), other) for other in candidats if other != uuid]
+            return [other for _, other in sorted(todos)[:limit]]
+        # Orden final: positivos, ceros por uuid y negativos; solo se extrae lo necesario
+        result = [other for _, other in heapq.nsmallest(
+            limit, ((-sim, other) for other, sim in similarities.items() if sim > 0))]
+        if len(result) < limit:
+            result += heapq.nsmallest(limit - len(result), (other for other in candidats
+                                                            if other != uuid and other not in similarities))
+        if len(result) < limit:
+            result += [other for _, other in heapq.nsmallest(
+                limit - len(result), ((-sim, other) for other, sim in similarities.items() if sim < 0))]
+        return result
 
+    @Metrics.timed("searchmetadata_get_auto_play")
     def get_auto_play(self, length: int) -> list:
         if length <= 0:
             return []
+        video_data = self.__video_data
 
-        videos_ranked = [(self.__video_data.get_video_rank(uuid), uuid) for uuid in self.__video_data]
-        videos_ranked.sort(key=lambda x: (-x[0], x[1]))
-        top_videos = [uuid for _, uuid in videos_ranked[:min(length, 25)]]
+        top_videos = video_data.get_top_videos(min(length, 25))
 
         similar_videos = set()
+        forwards = {}
         for uuid in top_videos:
-            similar_videos.update(self.get_similar(uuid, length // 2))
+            forwards[uuid] = video_data.get_video_distances(uuid)
+            similar_videos.update(self.__similars(uuid, min(length // 2, 25), forward=forwards[uuid]))
 
         combined_videos = list(set(top_videos) | similar_videos)
-        combined_videos.sort(key=lambda x: (-self.__video_data.get_video_rank(x), x))
-
-        similarity_scores = {
-            uuid: sum(
-                self.get_similarity_score(uuid, other_uuid)
-                for other_uuid in combined_videos if uuid != other_uuid
-            )
-            for uuid in combined_videos
-        }
-
-        sorted_videos = sorted(similarity_scores.items(), key=lambda x: (-x[1], x[0]))
-        final_list = [uuid for uuid, _ in sorted_videos[:length]]
+        combined_videos.sort(key=lambda x: (-video_data.get_video_rank(x), x))
+        score = self.__similarity_scores(combined_videos, forwards)
+
+        millors = heapq.nsmallest(length, zip(combined_videos, score), key=lambda x: (-x[1], x[0]))
+        final_list = [uuid for uuid, _ in millors]
         while len(final_list) < length:
             final_list.append(None)
 
         return final_list
 
+    @Metrics.timed("searchmetadata_similarity_scores")
+    def __similarity_scores(self, videos, forwards):
+        """
+        Suma de get_similarity_score(u, v) para cada u contra el resto de
+        videos. Un Dijkstra por vídeo (que para al resolver todos los de la
+        lista, o reutiliza forwards) llena la matriz K x K de valor/aristas
+        F; la similitud es S = A + A.T con A = F * rank/2 por filas. Cada
+        fila se suma en el orden de videos, así el resultado (y los empates)
+        coincide con el del doble bucle.
+        """
+        import numpy  # solo aquí: el resto de búsquedas no la necesitan
+        video_data = self.__video_data
+        posicions = {uuid: i for i, uuid in enumerate(videos)}
+        F = numpy.zeros((len(videos), len(videos)))
+        for i, uuid in enumerate(videos):
+            distancies = forwards.get(uuid)
+            if distancies is None:
+                distancies = video_data.get_video_distances(uuid, destins=posicions)
+            for other_uuid, (nodes, value) in distancies.items():
+                j = posicions.get(other_uuid)
+                if j is not None and nodes > 0:
+                    F[i, j] = value / nodes
+        ranks = numpy.array([video_data.get_video_rank(uuid) for uuid in videos], dtype=float)
+        A = F * (ranks / 2)[:, None]
+        S = A + A.T
+        return [sum(fila) for fila in S.tolist()]
+
+    @Metrics.timed("searchmetadata_get_similarity_score")
     def get_similarity_score(self, uuid1: str, uuid2: str) -> float:
         AB_nodes, AB_value = self.__video_data.get_video_distance(uuid1, uuid2)
         BA_nodes, BA_value = self.__video_data.get_video_distance(uuid2, uuid1)
@@ -155,23 +232,63 @@ class SearchMetadata:
         BA_sim = (BA_value / BA_nodes) * (self.__video_data.get_video_rank(uuid2) / 2) if BA_nodes > 0 else 0
 
         return AB_sim + BA_sim
+
+    @Metrics.timed("searchmetadata_search_complex")
     def search_complex(self, criteria):
-        result = set(self.video_data.metadata.keys())  # Inicializamos con todos los elementos
-        for criterion, value in criteria.items():
-            if criterion == "duration":
-                result &= set(self.duration(value[0], value[1]))  # Intersección de duración
-            elif criterion == "title":
-                result &= set(self.title(value))
-            elif criterion == "album":
-                result &= set(self.album(value))
-            elif criterion == "artist":
-                result &= set(self.artist(value))
-            elif criterion == "composer":
-                result &= set(self.composer(value))
-            elif criterion == "genre":
-                result &= set(self.genre(value))
-            elif criterion == "date":
-                result &= set(self.date(value))
-            elif criterion == "comment":
-                result &= set(self.comment(value))
-        return list(result)
+        """
+        Búsqueda con varios criterios. criteria puede ser un dict {campo: valor}
+        (AND de todos) o un árbol ("and", e1, e2, ...) / ("or", e1, e2, ...)
+        cuyas hojas son (campo, valor) o dicts. Se evalúa primero el criterio
+        más selectivo y el resto solo filtra los candidatos supervivientes.
+        """
+        return list(self.__evalua(criteria, None))
+
+    def __estima(self, expr):
+        """Cota superior del número de resultados de expr, sin evaluarla."""
+        total = len(self.video_data)
+        if isinstance(expr, dict):
+            return min((self.__estima(item) for item in expr.items()), default=total)
+        op = expr[0]
+        if op == "and":
+            return min((self.__estima(fill) for fill in expr[1:]), default=total)
+        if op == "or":
+            return min(total, sum(self.__estima(fill) for fill in expr[1:]))
+        criterion, value = expr
+        if criterion == "duration":
+            return self.video_data.count_duration(value[0], value[1])
+        if criterion in CRITERIS_TEXT:
+            return self.video_data.estimate_text(criterion, value)
+        return total  # criterio desconocido: no restringe
+
+    def __evalua(self, expr, candidats):
+        """Conjunto de UUIDs que cumplen expr; si candidats no es None, dentro de candidats."""
+        if isinstance(expr, dict):
+            return self.__evalua_and(list(expr.items()), candidats)
+        op = expr[0]
+        if op == "and":
+            return self.__evalua_and(expr[1:], candidats)
+        if op == "or":
+            result = set()
+            for fill in expr[1:]:
+                result |= self.__evalua(fill, candidats)
+            return result
+        criterion, value = expr
+        # Con pocos candidatos es más barato comprobarlos uno a uno que ir al índice
+        filtra = candidats is not None and len(candidats) <= self.__estima(expr)
+        if criterion == "duration":
+            result = self.video_data.match_duration(value[0], value[1], candidats if filtra else None)
+        elif criterion in CRITERIS_TEXT:
+            result = self.video_data.match_text(criterion, value, candidats if filtra else None)
+        else:
+            return set(self.video_data.metadata.keys()) if candidats is None else candidats
+        if candidats is not None and not filtra:
+            result &= candidats
+        return result
+
+    def __evalua_and(self, fills, candidats):
+        result = candidats
+        for fill in sorted(fills, key=self.__estima):
+            result = self.__evalua(fill, result)
+            if not result:
+                return set()  # cortocircuito
+        return set(self.video_data.metadata.keys()) if result is None else result
@@ -1,41 +1,135 @@
 from GrafHash import GrafHash
-from ElementData import ElementData
 import os
 import sys
-import tinytag
-import numpy
+import math
 import cfg
+import Metrics
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from NGramIndex import NGramIndex
+from DurationIndex import DurationIndex
+from MetadataCache import MetadataCache
+from MetadataStore import MetadataStore
+
+# Campos de texto buscables y su posición en la lista de metadata
+CAMPS_TEXT = (("title", 3), ("album", 4), ("artist", 5), ("composer", 6),
+              ("genre", 7), ("date", 8), ("comment", 9))
+# Atributos de tinytag en el mismo orden que CAMPS_TEXT
+ATRIBUTS_TINYTAG = ("title", "album", "artist", "composer", "genre", "year", "comment")
+
+
+def llegeix_tags(path):
+    """
+    Lee un MP4 con tinytag y devuelve [duración, título, álbum, artista,
+    compositor, género, año, comentario], o None si tinytag no lo reconoce.
+    Es una función de módulo para poder usarse desde un ProcessPoolExecutor.
+    tinytag se importa aquí: el catálogo y las búsquedas no lo necesitan.
+    """
+    import tinytag
+    metadata = tinytag.TinyTag.get(path)
+    if metadata is None:
+        return None
+    # Sin duración en los tags (atributo ausente o None) queda -1, como si no se hubiera leído
+    duration = getattr(metadata, "duration", None)
+    duration = -1 if duration is None else math.ceil(duration)
+    valores = [duration]
+    # Cambié "None" por "" para que devuelva cadenas vacías en lugar de None
+    for attr in ATRIBUTS_TINYTAG:
+        try:
+            value = getattr(metadata, attr, "")
+        except AttributeError:
+            value = ""
+        valores.append(value)
+    return valores
+
 
 class VideoData:
-    __slots__ = ['__graph', '__metadata']
+    __slots__ = ['__graph', '__metadata', '__fitxers', '__indexs', '__durades', '__cache']
 
-    def __init__(self):
+    def __init__(self, cache=None):
         self.__graph = GrafHash()
-        self.__metadata = {}
+        self.__metadata = MetadataStore()
+        self.__fitxers = {}  # filename -> uuid
+        self.__indexs = {camp: NGramIndex() for camp, _ in CAMPS_TEXT}
+        self.__durades = DurationIndex()
+        self.__cache = cache  # MetadataCache opcional para no releer ficheros sin cambios
+
+    def snapshot_state(self):
+        """
+        Estado exportable (uuids, columnas, csr) para LibrarySnapshot: los
+        uuids en el orden de los vértices del grafo, las columnas de
+        MetadataStore.columns en ese mismo orden y el grafo congelado.
+        """
+        csr = self.__graph.freeze()
+        uuids = list(csr)
+        return uuids, self.__metadata.columns(uuids), csr
+
+    @classmethod
+    def from_snapshot_state(cls, uuids, columnes, csr, cache=None):
+        """
+        Reconstruye un VideoData a partir de snapshot_state(). Los índices de
+        texto y de duración no se guardan: se construyen en la primera consulta.
+        """
+        video_data = cls(cache)
+        store = MetadataStore.from_columns(uuids, columnes)
+        video_data.__metadata = store
+        video_data.__fitxers = dict(zip(columnes["filename"], uuids))
+        video_data.__graph = GrafHash.from_csr(csr, map(store.element, uuids))
+        video_data.__indexs = None
+        video_data.__durades = None
+        return video_data
+
+    def __indexs_llestos(self):
+        """(índices de texto, índice de duración), construyéndolos si están pendientes."""
+        if self.__indexs is None:
+            indexs = {camp: NGramIndex() for camp, _ in CAMPS_TEXT}
+            durades = DurationIndex()
+            store = self.__metadata
+            for uuid, fila in store.rows.items():
+                for camp, index in indexs.items():
+                    index.add(uuid, store.tag(fila, camp))
+            durades.update((uuid, store.duration(fila)) for uuid, fila in store.rows.items())
+            self.__indexs, self.__durades = indexs, durades
+        return self.__indexs, self.__durades
+
+    def set_cache(self, cache):
+        """
+        Asocia (o quita, con None) una MetadataCache persistente. Las cargas
+        sueltas de load_metadata quedan en el lote de la cache: se escriben al
+        cambiarla aquí, con flush_cache() o al cerrarla.
+        """
+        if self.__cache is not None and self.__cache is not cache:
+            self.__cache.flush()
+        self.__cache = cache
+
+    def flush_cache(self):
+        """Escribe en disco las entradas pendientes de la MetadataCache, si hay."""
+        if self.__cache is not None:
+            self.__cache.flush()
 
     def get_video_rank(self, uuid: str) -> int:
         if not self.existeix_uuid(uuid):
             return 0  # Retorna 0 si el UUID no existe
-        # Asumimos que get_edges_out y get_edges_in retornan diccionarios
-        rank_out = sum(self.__graph.get_edges_out(uuid).values()) if self.__graph.get_edges_out(uuid) else 0
-        rank_in = sum(self.__graph.get_edges_in(uuid).values()) if self.__graph.get_edges_in(uuid) else 0
-        return rank_out + rank_in
+        # El grafo mantiene los grados ponderados al día: O(1)
+        return self.__graph.grauPesOut(uuid) + self.__graph.grauPesIn(uuid)
+
+    def get_top_videos(self, k: int) -> list:
+        """Los k vídeos de mayor rank (empates por UUID), sin ordenar toda la biblioteca."""
+        return self.__graph.top_rank(k)
     
     def get_next_videos(self, uuid: str):
         """Iterador de vídeos directamente conectados como sucesores del nodo dado."""
         if not self.existeix_uuid(uuid):  # Verifica que el uuid exista
             return iter([])  # Si no existe, devuelve un iterador vacío
         
-        edges_out = self.__graph.get_edges_out(uuid)
-        return iter(edges_out.items()) if edges_out else iter([])
+        return self.__graph.edges(uuid)
     
     def get_previous_videos(self, uuid: str):
         """Iterador de vídeos directamente conectados como predecesores del nodo dado."""
         if not self.existeix_uuid(uuid):  # Verifica que el uuid exista
             return iter([])  # Si no existe, devuelve un iterador vacío
         
-        edges_in = self.__graph.get_edges_in(uuid)
-        return iter(edges_in.items()) if edges_in else iter([])
+        return self.__graph.edges_inv(uuid)
     
     def get_video_distance(self, uuid1: str, uuid2: str) -> (int, int):
         """
@@ -44,139 +138,364 @@ class VideoData:
         """
         if not self.existeix_uuid(uuid1) or not self.existeix_uuid(uuid2):
             return 0, 0  # Si algún UUID no existe, retorna (0, 0)
-    
-        path = self.__graph.dijkstraModif(uuid1, uuid2)  # Asegúrate de que este método esté implementado
-        if path is None:
+
+        distancia = self.__graph.distancia(uuid1, uuid2)
+        if distancia is None:
             return 0, 0  # No hay camino, retorna (0, 0)
-    
-        edges = zip(path, path[1:])
-        nodes_count = len(path) - 1
-        total_weight = sum(self.__graph.get_weight(u, v) for u, v in edges)
-    
-        return nodes_count, total_weight
+        return distancia
+
+    def es_digraf(self):
+        """Indica si el grafo de co-reproducción es dirigido (si no, AB y BA coinciden)."""
+        return self.__graph.es_digraf()
+
+    def get_video_distances(self, uuid: str, invers=False, destins=None) -> dict:
+        """
+        Distancias mínimas desde un vídeo a todos los alcanzables en una sola pasada.
+        Devuelve {uuid_destino: (aristas, peso)}; con invers=True, las de cada vídeo hacia uuid.
+        Con destins, solo las de esos vídeos, parando en cuanto se conocen todas.
+        """
+        if not self.existeix_uuid(uuid):
+            return {}
+        return self.__graph.distancies(uuid, invers, destins)
+
+    def get_video_distances_local(self, uuid: str, invers=False, max_salts=None, max_pes=None):
+        """
+        Como get_video_distances, pero solo dentro de un radio de max_salts
+        aristas y/o max_pes de peso alrededor de uuid. Devuelve
+        ({uuid_destino: (aristas, peso)}, vértices expandidos).
+        """
+        if not self.existeix_uuid(uuid):
+            return {}, 0
+        return self.__graph.distancies_locals(uuid, invers, max_salts, max_pes)
 
 
     def existeix_file(self, filename):
         """Verifica si un archivo ya existe en la metadata."""
-        values = list(self.__metadata.values())
-        files = [v[0] for v in values]
-        return filename in files
+        return filename in self.__fitxers
 
     def add_video(self, uuid, filename):
         if not self.existeix_file(filename):  # Verifica si el archivo no existe ya
             if uuid and filename:
                 root = cfg.get_root()
                 path = os.path.realpath(os.path.join(root, filename))
-                
-                # Aquí inicializamos los valores con cadenas vacías "" en lugar de "None"
-                self.__metadata[uuid] = [
-                    filename, path, -1, "", "", "", "", "", "", ""
-                ]
-                self.__graph.insert_vertex(uuid, ElementData(filename=filename))
-
-
+                self.__registra(uuid, filename, path)
+                self.__graph.insert_vertex(uuid, self.__metadata.element(uuid))
+                self.__indexa(uuid)
 
+    def add_videos(self, pairs):
+        """
+        Versión en bloque de add_video para pares (uuid, filename). La raíz y
+        la ruta real de cada directorio se resuelven una sola vez por lote.
+        Devuelve los UUIDs añadidos, cada uno una vez aunque se repita en el lote.
+        """
+        root = cfg.get_root()
+        directoris = {}  # directorio -> ruta real
+        nous = {}  # uuid -> None, en orden de llegada y sin repetidos
+        for uuid, filename in pairs:
+            if not uuid or not filename or filename in self.__fitxers:
+                continue
+            if uuid in self.__metadata and self.__indexs is not None:
+                self.__desindexa(uuid)  # se reinicia como en add_video
+            path = self.__ruta_real(os.path.join(root, filename), directoris)
+            self.__registra(uuid, filename, path)
+            nous[uuid] = None
+        nous = list(nous)
+        self.__graph.insert_vertices((uuid, self.__metadata.element(uuid)) for uuid in nous)
+        if self.__durades is not None:
+            self.__durades.update((uuid, -1) for uuid in nous)
+        return nous
+
+    @staticmethod
+    def __ruta_real(ruta, directoris):
+        """os.path.realpath(ruta) resolviendo cada directorio una sola vez."""
+        directori, nom = os.path.split(ruta)
+        if nom in ("", ".", ".."):
+            return os.path.realpath(ruta)
+        if directori not in directoris:
+            directoris[directori] = os.path.realpath(directori)
+        path = os.path.join(directoris[directori], nom)
+        # Solo un enlace simbólico en el propio fichero cambiaría el resultado
+        return os.path.realpath(path) if os.path.islink(path) else path
+
+    def __registra(self, uuid, filename, path):
+        """Crea la entrada de metadata y la del índice de ficheros."""
+        if uuid in self.__metadata:
+            self.__fitxers.pop(self.get_filename(uuid), None)
+        # Duración -1 y cadenas vacías "" hasta que se carguen los tags
+        self.__metadata.add(uuid, filename, path)
+        self.__fitxers[filename] = uuid
 
     def remove_video(self, uuid):
         """Elimina un video de la metadata usando su UUID."""
         if uuid in self.__metadata:
             self.__graph.__delitem__(uuid)  # Elimina el nodo del grafo
-            del self.__metadata[uuid]
+            self.__desindexa(uuid)
+            del self.__fitxers[self.get_filename(uuid)]
+            self.__metadata.remove(uuid)
+
+    def remove_videos(self, uuids):
+        """Elimina un lote de videos (p.ej. los de VideoFiles.files_removed()) en una sola pasada."""
+        uuids = [uuid for uuid in dict.fromkeys(uuids) if uuid in self.__metadata]  # sin repetidos
+        self.__graph.remove_vertices(uuids)
+        for uuid in uuids:
+            self.__desindexa(uuid)
+            del self.__fitxers[self.get_filename(uuid)]
+            self.__metadata.remove(uuid)
+
+    def __indexa(self, uuid):
+        """Actualiza los índices de texto con la metadata actual de uuid."""
+        if self.__indexs is None:
+            return  # se construirán con la metadata actual en la primera consulta
+        valores = self.__metadata[uuid]
+        for camp, index in CAMPS_TEXT:
+            self.__indexs[camp].add(uuid, valores[index])
+        self.__durades.add(uuid, valores[2])
+
+    def __desindexa(self, uuid):
+        if self.__indexs is None:
+            return
+        for index in self.__indexs.values():
+            index.remove(uuid)
+        self.__durades.remove(uuid)
+
+    @Metrics.timed("videodata_search_text")
+    def search_text(self, camp, sub):
+        """
+        Lista de UUIDs cuyo campo de texto contiene sub (sin distinguir
+        mayúsculas), en orden de inserción como el recorrido de la metadata.
+        """
+        return self.__metadata.ordena(self.__indexs_llestos()[0][camp].search(sub))
+
+    def match_text(self, camp, sub, uuids=None):
+        """
+        Conjunto de UUIDs cuyo campo contiene sub. Con uuids, solo se
+        comprueban esos candidatos en lugar de consultar el índice.
+        """
+        index = self.__indexs_llestos()[0][camp]
+        if uuids is None:
+            return index.search(sub)
+        return {uuid for uuid in uuids if index.matches(uuid, sub)}
+
+    def estimate_text(self, camp, sub):
+        """Cota superior barata del número de vídeos que contienen sub en el campo."""
+        return self.__indexs_llestos()[0][camp].estimate(sub)
+
+    def match_duration(self, min_duration, max_duration, uuids=None):
+        """Conjunto de UUIDs en el rango de duración, opcionalmente restringido a uuids."""
+        durades = self.__indexs_llestos()[1]
+        if uuids is None:
+            return set(durades.range(min_duration, max_duration))
+        return {uuid for uuid in uuids
+                if (duration := durades.get(uuid)) is not None and min_duration <= duration <= max_duration}
+
+    def search_duration(self, min_duration, max_duration):
+        """
+        Lista de UUIDs con min_duration <= duración <= max_duration, en orden
+        de inserción. El índice los encuentra en O(log N + k) y se ordenan en
+        O(k log k).
+        """
+        return self.__metadata.ordena(self.__indexs_llestos()[1].range(min_duration, max_duration))
 
+    def count_duration(self, min_duration, max_duration):
+        """Número de vídeos en el rango de duración, sin construir la lista."""
+        return self.__indexs_llestos()[1].count(min_duration, max_duration)
+
+    @Metrics.timed("videodata_load_metadata")
     def load_metadata(self, uuid):
         """Carga los metadatos desde un archivo MP4 y los guarda en la metadata del video."""
         if uuid in self.__metadata:
-            path = self.__metadata[uuid][1]
-            metadata = tinytag.TinyTag.get(path)
-
-            if metadata is None:
-                print("ERROR: Archivo MP4 erróneo!")
-                sys.exit(1)
-
-            try:
-                duration = int(numpy.ceil(metadata.duration))
-            except AttributeError:
-                duration = -1
-            self.__metadata[uuid][2] = duration  
-
-            # Cambié "None" por "" para que devuelva cadenas vacías en lugar de None
-            for attr, index in [
-                ("title", 3),
-                ("album", 4),
-                ("artist", 5),
-                ("composer", 6),
-                ("genre", 7),
-                ("year", 8),
-                ("comment", 9),
-            ]:
-                try:
-                    value = getattr(metadata, attr, "")
-                except AttributeError:
-                    value = ""
-                self.__metadata[uuid][index] = value  
+            path = self.get_path(uuid)
+            signatura = None
+            valores = None
+            if self.__cache is not None:
+                signatura = MetadataCache.signatura(path)
+                valores = self.__cache.get(path, signatura)
+            if valores is None:
+                valores = llegeix_tags(path)
+
+                if valores is None:
+                    print("ERROR: Archivo MP4 erróneo!")
+                    sys.exit(1)
+
+                if self.__cache is not None:
+                    self.__cache.put(path, signatura, valores)  # se escribe por lotes
+
+            self.__aplica_tags([(uuid, valores)])
+
+    @Metrics.timed("videodata_load_metadata_bulk")
+    def load_metadata_bulk(self, uuids, workers=8, processos=False, lot=256,
+                           max_en_vol=None, progress=None):
+        """
+        Carga los metadatos de muchos vídeos en paralelo (hilos, o procesos con
+        processos=True). Como mucho max_en_vol ficheros se leen a la vez; los
+        resultados se aplican en lotes de `lot` en el hilo que llama.
+        progress(hechos, total) se llama tras cada lote. Un fichero erróneo no
+        detiene la carga: devuelve {uuid: excepción} con los que han fallado.
+        """
+        pendents = [(uuid, self.get_path(uuid)) for uuid in uuids if uuid in self.__metadata]
+        total = len(pendents)
+        max_en_vol = max_en_vol or workers * 4
+        errors = {}
+        resultats = []
+        fets = 0
+        signatures = {}
+        if self.__cache is not None:
+            # Primero la caché: solo se leen los ficheros nuevos o modificados
+            for uuid, path in pendents:
+                signatures[uuid] = MetadataCache.signatura(path)
+            guardats = self.__cache.get_many((path, signatures[uuid]) for uuid, path in pendents)
+            encerts = [(uuid, valores) for (uuid, _), valores in zip(pendents, guardats) if valores is not None]
+            pendents = [entrada for entrada, valores in zip(pendents, guardats) if valores is None]
+            for i in range(0, len(encerts), lot):
+                self.__aplica_tags(encerts[i:i + lot])
+            fets = len(encerts)
+            if encerts and progress is not None:
+                progress(fets, total)
+        if processos:
+            from concurrent.futures import ProcessPoolExecutor as Executor  # arrastra multiprocessing
+        else:
+            Executor = ThreadPoolExecutor
+        with Executor(max_workers=workers) as executor:
+            en_vol = {}
+            cua = iter(pendents)
+            while True:
+                for uuid, path in cua:
+                    en_vol[executor.submit(llegeix_tags, path)] = uuid
+                    if len(en_vol) >= max_en_vol:
+                        break
+                if not en_vol:
+                    break
+                acabats, _ = wait(en_vol, return_when=FIRST_COMPLETED)
+                for futur in acabats:
+                    uuid = en_vol.pop(futur)
+                    fets += 1
+                    try:
+                        valores = futur.result()
+                    except Exception as e:
+                        errors[uuid] = e
+                        continue
+                    if valores is None:
+                        errors[uuid] = ValueError("Archivo MP4 erróneo")
+                    else:
+                        resultats.append((uuid, valores))
+                        if self.__cache is not None:
+                            self.__cache.put(self.get_path(uuid), signatures[uuid], valores)
+                if len(resultats) >= lot:
+                    self.__aplica_tags(resultats)
+                    resultats = []
+                    if progress is not None:
+                        progress(fets, total)
+        self.__aplica_tags(resultats)
+        if self.__cache is not None:
+            self.__cache.flush()
+        if progress is not None:
+            progress(fets, total)
+        return errors
+
+    def __aplica_tags(self, resultats, carregat=True):
+        """
+        Guarda [duración, título, ...] en la metadata y en los índices;
+        carregat=False si no vienen de leer el fichero (pistas de un M3U).
+        """
+        durades = []
+        for uuid, valores in resultats:
+            if uuid not in self.__metadata:
+                continue  # eliminado mientras se leía
+            # El ElementData del grafo es una referencia a la fila: no hay que copiar nada
+            self.__metadata.set_tags(uuid, valores, carregat)
+            if self.__indexs is not None:
+                for (camp, _), value in zip(CAMPS_TEXT, valores[1:]):
+                    self.__indexs[camp].add(uuid, value)
+                durades.append((uuid, valores[0]))
+        if self.__durades is not None:
+            self.__durades.update(durades)
+
+    def set_hints(self, hints):
+        """
+        Aplica {uuid: (duración, título)} de los #EXTINF de un M3U a los vídeos
+        cuya metadata aún no se ha leído del fichero; un valor None no se
+        aplica. Devuelve los UUIDs con duración, que ya no necesitan tinytag
+        para las búsquedas por duración.
+        """
+        store = self.__metadata
+        resultats = []
+        for uuid, (durada, titol) in hints.items():
+            if uuid not in store.rows:
+                continue
+            fila = store.fila(uuid)
+            if store.carregat(fila):
+                continue  # ya leída (aunque sea sin duración): tinytag manda sobre el M3U
+            valores = [store.duration(fila)] + [store.tag(fila, camp) for camp, _ in CAMPS_TEXT]
+            if durada is not None:
+                valores[0] = durada
+            if titol is not None:
+                valores[1] = titol
+            resultats.append((uuid, valores))
+        self.__aplica_tags(resultats, carregat=False)
+        return [uuid for uuid, valores in resultats if valores[0] != -1]
 
     def __len__(self):
         return len(self.__metadata)
 
     def existeix_uuid(self, uuid):
         """Verifica si un UUID existe en la metadata."""
-        return uuid in self.__metadata.keys()
+        return uuid in self.__metadata
 
     def existeix_meta(self, uuid):
         """Verifica si un UUID tiene metadata completa."""
-        return self.existeix_uuid(uuid) and len(self.__metadata[uuid]) > 2
+        return self.existeix_uuid(uuid)  # todas las filas tienen todas las columnas
 
     def get_filename(self, uuid):
         """Devuelve el nombre del archivo asociado a un UUID."""
         if uuid in self.__metadata:
-            return self.__metadata[uuid][0]
+            return self.__metadata.filename(self.__metadata.fila(uuid))
             
     def get_path(self, uuid):
         """Devuelve la ruta del archivo asociada a un UUID."""
         if self.existeix_meta(uuid):
-            return self.__metadata[uuid][1]
+            return self.__metadata.path(self.__metadata.fila(uuid))
 
     def get_duration(self, uuid):
         """Devuelve la duración del video asociado a un UUID."""
         if self.existeix_meta(uuid):
-            return self.__metadata[uuid][2]
+            return self.__metadata.duration(self.__metadata.fila(uuid))
         return None  # Retorna None si no existe el UUID
 
 
     def get_title(self, uuid):
         """Devuelve el título del video asociado a un UUID."""
         if self.existeix_meta(uuid):
-            return str(self.__metadata[uuid][3])
+            return str(self.__metadata.tag(self.__metadata.fila(uuid), "title"))
 
     def get_album(self, uuid):
         """Devuelve el álbum del video asociado a un UUID."""
         if self.existeix_meta(uuid):
-            return str(self.__metadata[uuid][4])
+            return str(self.__metadata.tag(self.__metadata.fila(uuid), "album"))
 
     def get_artist(self, uuid):
         """Devuelve el artista del video asociado a un UUID."""
         if self.existeix_meta(uuid):
-            return str(self.__metadata[uuid][5])
+            return str(self.__metadata.tag(self.__metadata.fila(uuid), "artist"))
 
     def get_composer(self, uuid):
         """Devuelve el compositor del video asociado a un UUID."""
         if self.existeix_meta(uuid):
-            return str(self.__metadata[uuid][6])
+            return str(self.__metadata.tag(self.__metadata.fila(uuid), "composer"))
 
     def get_genre(self, uuid):
         """Devuelve el género del video asociado a un UUID."""
         if self.existeix_meta(uuid):
-            return str(self.__metadata[uuid][7])
+            return str(self.__metadata.tag(self.__metadata.fila(uuid), "genre"))
 
     def get_date(self, uuid):
         """Devuelve el año del video asociado a un UUID."""
         if self.existeix_meta(uuid):
-            return str(self.__metadata[uuid][8])
+            return str(self.__metadata.tag(self.__metadata.fila(uuid), "date"))
 
     def get_comment(self, uuid):
         """Devuelve los comentarios del video asociado a un UUID."""
         if self.existeix_meta(uuid):
-            return str(self.__metadata[uuid][9])
+            return str(self.__metadata.tag(self.__metadata.fila(uuid), "comment"))
 
     @property
     def metadata(self):
@@ -189,7 +508,7 @@ class VideoData:
 
     def __iter__(self):
         """Devuelve un iterador sobre los UUIDs de los vídeos."""
-        return iter(self.__metadata.keys())
+        return iter(self.__metadata)
 
     def __hash__(self):
         return hash(frozenset(self.__metadata.keys()))
@@ -209,11 +528,43 @@ class VideoData:
         
         # Función que procesa la lista de reproducción y añade las aristas
     def read_playlist(self, obj_playlist: 'PlayList'):
-        videos = [uuid for uuid in obj_playlist if self.existeix_uuid(uuid)]
-        for i in range(len(videos) - 1):
-            uuid1, uuid2 = videos[i], videos[i + 1]
-            if self.__graph.existeix_arestes(uuid1, uuid2):
-                weight = self.__graph.get_weight(uuid1, uuid2) + 1
-                self.__graph.update_edge_weight(uuid1, uuid2, weight)
-            else:
-                self.__graph.insert_edge(uuid1, uuid2, 1)
+        self.read_playlists([obj_playlist])
+
+    @Metrics.timed("videodata_read_playlists")
+    def read_playlists(self, playlists):
+        """
+        Procesa muchas listas de reproducción a la vez: las transiciones se
+        acumulan en un Counter y se aplican al grafo en una única fusión.
+        """
+        transiciones = Counter()
+        metadata = self.__metadata.rows
+        for obj_playlist in playlists:
+            videos = [uuid for uuid in obj_playlist if uuid in metadata]
+            transiciones.update(zip(videos, videos[1:]))
+        Metrics.count("videodata_transiciones_distintas", len(transiciones))
+        self.__graph.add_edge_weights(transiciones)
+
+    @Metrics.timed("videodata_read_stream")
+    def read_stream(self, uuids, lot=65536):
+        """
+        Versión en streaming de read_playlist para un iterable de UUIDs (p.ej.
+        PlayList.iter_file): las transiciones se cuentan en un Counter que se
+        vuelca al grafo cada `lot` transiciones, así que la memoria no depende
+        de la longitud de la lista. Devuelve el número de transiciones.
+        """
+        metadata = self.__metadata.rows
+        transiciones = Counter()
+        total = 0
+        anterior = None
+        for uuid in uuids:
+            if uuid not in metadata:
+                continue
+            if anterior is not None:
+                transiciones[(anterior, uuid)] += 1
+                total += 1
+                if total % lot == 0:
+                    self.__graph.add_edge_weights(transiciones)
+                    transiciones.clear()
+            anterior = uuid
+        self.__graph.add_edge_weights(transiciones)
+        return total
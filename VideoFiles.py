@@ -5,37 +5,130 @@ VideoFiles.py : ** REQUIRED ** El vostre codi de la classe VideoFiles.
 import cfg  
 import os.path
 import sys
-import numpy  
-import uuid
-import vlc  
 import time
-import sys
 import os
+import Metrics
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Resolució del mtime més grollera que es té en compte (FAT: 2 s). Un directori
+# modificat dins d'aquesta finestra abans de l'escaneig pot tornar a canviar
+# sense que el seu mtime es mogui, i per això no se'n reaprofita el llistat.
+GRANULARITAT_NS = 2_000_000_000
 
 class VideoFiles():
-    __slots__ = ['__llista', '__files_added', '__files_removed']
+    __slots__ = ['__llista', '__files_added', '__files_removed', '__files_modified',
+                 '__directoris', '__signatures']
 
     def __init__(self):
-        self.__llista = []
+        self.__llista = {}  # conjunt ordenat de fitxers (dict fitxer -> None)
         self.__files_added = []
         self.__files_removed = []
+        self.__files_modified = []
+        self.__directoris = {}  # directori -> (mtime_ns o None, fitxers .mp4, subdirectoris)
+        self.__signatures = {}  # fitxer -> (mida, mtime_ns), només amb check_modified
 
-    def reload_fs(self, root):
-        afegits = []
-        self.__files_added = []
-        self.__files_removed = []  
-        for root_dir, dirs, files in os.walk(root):
-            for filename in files:
-                if filename.lower().endswith(tuple(['.mp4'])):
-                    file = os.path.join(root_dir, filename)
-                    afegits.append(file)
-                    if file not in self.__llista:  # Cambiado _llista a __llista
-                        self.__llista.append(file)  # Cambiado _llista a __llista
-                        self.__files_added.append(file)  # Cambiado _files_added a __files_added
-
-        for fitxer in self.__llista:  # Cambiado _llista a __llista
-            if fitxer not in afegits:
-                self.__files_removed.append(fitxer)  # Cambiado _files_removed a __files_removed
+    def __visita(self, directori, check_modified, inici):
+        """ Escaneja un directori i, si cal, fa stat dels seus fitxers. """
+        resultat = self.__escaneja(directori, inici)
+        if resultat is None or not check_modified:
+            return resultat, None
+        signatures = {}
+        for fitxer in resultat[1]:
+            try:
+                st = os.stat(fitxer)
+            except OSError:
+                continue
+            signatures[fitxer] = (st.st_size, st.st_mtime_ns)
+        return resultat, signatures
+
+    def __escaneja(self, directori, inici):
+        """
+        Llista un directori, o reaprofita l'últim escaneig si el seu mtime no
+        ha canviat. Si el mtime és a menys de GRANULARITAT_NS d'inici (l'hora
+        de començar l'escaneig) es guarda com a None perquè el pròxim
+        escaneig el torni a llistar.
+        """
+        try:
+            mtime = os.stat(directori).st_mtime_ns
+        except OSError:
+            return None
+        anterior = self.__directoris.get(directori)
+        if anterior is not None and anterior[0] == mtime:
+            return anterior
+        fitxers, subdirectoris = [], []
+        try:
+            with os.scandir(directori) as entrades:
+                for entrada in entrades:
+                    try:
+                        es_dir = entrada.is_dir()
+                    except OSError:
+                        es_dir = False
+                    if es_dir:
+                        # Com os.walk: no es segueixen els enllaços a directoris
+                        if not entrada.is_symlink():
+                            subdirectoris.append(entrada.path)
+                    elif entrada.name.lower().endswith('.mp4'):
+                        fitxers.append(entrada.path)
+        except OSError:
+            return None
+        if mtime >= inici - GRANULARITAT_NS:
+            mtime = None
+        return mtime, tuple(fitxers), tuple(subdirectoris)
+
+    @Metrics.timed("videofiles_reload_fs")
+    def reload_fs(self, root, workers=8, check_modified=False):
+        """
+        Torna a escanejar root. Els directoris amb el mateix mtime que a
+        l'escaneig anterior no es tornen a llistar, i els directoris es
+        recorren en paral·lel amb workers fils. Amb check_modified també es
+        fa stat de cada fitxer per omplir files_modified().
+        """
+        directoris = {}
+        signatures = {}
+        inici = time.time_ns()
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                en_curs = {executor.submit(self.__visita, root, check_modified, inici): root}
+                while en_curs:
+                    acabats, _ = wait(en_curs, return_when=FIRST_COMPLETED)
+                    for futur in acabats:
+                        directori = en_curs.pop(futur)
+                        resultat, sigs = futur.result()
+                        if resultat is None:
+                            continue
+                        directoris[directori] = resultat
+                        if sigs:
+                            signatures.update(sigs)
+                        for subdirectori in resultat[2]:
+                            en_curs[executor.submit(self.__visita, subdirectori, check_modified,
+                                                    inici)] = subdirectori
+        else:
+            pila = [root]
+            while pila:
+                directori = pila.pop()
+                resultat, sigs = self.__visita(directori, check_modified, inici)
+                if resultat is not None:
+                    directoris[directori] = resultat
+                    if sigs:
+                        signatures.update(sigs)
+                    pila.extend(resultat[2])
+        self.__directoris = directoris
+        Metrics.count("videofiles_directoris_escanejats", len(directoris))
+
+        if check_modified:
+            anteriors = self.__signatures
+            self.__files_modified = sorted(fitxer for fitxer, sig in signatures.items()
+                                           if fitxer in anteriors and anteriors[fitxer] != sig)
+            self.__signatures = signatures
+        else:
+            self.__files_modified = []
+
+        trobats = {fitxer for _, fitxers, _ in directoris.values() for fitxer in fitxers}
+        self.__files_removed = [fitxer for fitxer in self.__llista if fitxer not in trobats]
+        self.__files_added = sorted(trobats.difference(self.__llista))
+        for fitxer in self.__files_removed:
+            del self.__llista[fitxer]
+        self.__llista.update(dict.fromkeys(self.__files_added))
 
     def files_added(self):
         return self.__files_added  # Cambiado _files_added a __files_added
@@ -43,6 +136,10 @@ class VideoFiles():
     def files_removed(self):
         return self.__files_removed  # Cambiado _files_removed a __files_removed
 
+    def files_modified(self):
+        """ Fitxers que ja hi eren però han canviat de mida o mtime (només amb check_modified). """
+        return self.__files_modified
+
     def __len__(self):
         return len(self.__llista)  # Cambiado _llista a __llista
 
@@ -50,7 +147,7 @@ class VideoFiles():
         return iter(self.__llista)  # Cambiado _llista a __llista
 
     def __repr__(self):
-        return (f"VideoFiles(llista={self.__llista}, "
+        return (f"VideoFiles(llista={list(self.__llista)}, "
                 f"files_added={self.__files_added}, "
                 f"files_removed={self.__files_removed})")  # Cambiado _llista, _files_added, _files_removed a __llista, __files_added, __files_removed
 
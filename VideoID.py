@@ -1,14 +1,23 @@
 import uuid
 import os
+import hashlib
+
+# SHA-1 ja alimentat amb l'espai de noms: uuid5 = sha1(NAMESPACE_URL.bytes + nom)
+_SHA1_NAMESPACE_URL = hashlib.sha1(uuid.NAMESPACE_URL.bytes)
+# Bits de variant (RFC 4122) i versió 5 que uuid.UUID(version=5) fixaria
+_MASCARA_UUID5 = ~(0xc000 << 48) & ~(0xf000 << 64)
+_BITS_UUID5 = (0x8000 << 48) | (5 << 76)
+
 
 class VideoID:
     """
     Gestiona el parell file-path <-> UUID per a arxius MP4.
     """
-    __slots__ = ['__file_uuid_map']
+    __slots__ = ['__file_uuid_map', '__path_uuid_map']
 
     def __init__(self):
         self.__file_uuid_map = {}
+        self.__path_uuid_map = {}  # índex invers: fitxer -> str(UUID)
 
     def generate_uuid(self, file: str) -> str:
         """ Genera un nou UUID per a un arxiu si encara no existeix. """
@@ -18,14 +27,57 @@ class VideoID:
             print('COL·LISIÓ: Identificador utilitzat anteriorment, aquest UUID no serà utilitzat.')
         else:
             self.__file_uuid_map[new_uuid] = file
-            return str(new_uuid)
+            id_uuid = str(new_uuid)
+            self.__path_uuid_map[file] = id_uuid
+            return id_uuid
+
+    def generate_uuids(self, paths) -> list:
+        """
+        Versió en bloc de generate_uuid. Retorna una llista en l'ordre
+        d'entrada, amb None per als fitxers que ja tenien UUID.
+        """
+        resultat = []
+        col_lisions = 0
+        for file in paths:
+            if file in self.__path_uuid_map:
+                # Mateix fitxer, mateix uuid5: col·lisió segura sense calcular el hash
+                col_lisions += 1
+                resultat.append(None)
+                continue
+            h = _SHA1_NAMESPACE_URL.copy()
+            h.update(file.encode("utf-8"))
+            valor = int.from_bytes(h.digest()[:16], "big") & _MASCARA_UUID5 | _BITS_UUID5
+            new_uuid = uuid.UUID(int=valor)
+            if new_uuid in self.__file_uuid_map:
+                col_lisions += 1
+                resultat.append(None)
+                continue
+            self.__file_uuid_map[new_uuid] = file
+            id_uuid = str(new_uuid)
+            self.__path_uuid_map[file] = id_uuid
+            resultat.append(id_uuid)
+        if col_lisions:
+            print(f'COL·LISIÓ: {col_lisions} identificadors utilitzats anteriorment no seran utilitzats.')
+        return resultat
 
     def get_uuid(self, file: str) -> str:
         """ Retorna el UUID associat a un fitxer, si existeix. """
-        # Verificar si el fitxer existeix directament
-        for uuid, f in self.__file_uuid_map.items():
-            if f == file:
-                return str(uuid)
+        return self.__path_uuid_map.get(file)
+
+    def get_uuids(self, paths) -> list:
+        """ UUIDs dels fitxers en l'ordre d'entrada (None si no en tenen). """
+        index = self.__path_uuid_map
+        return [index.get(file) for file in paths]
+
+    def items(self):
+        """ Parells (UUID en text, fitxer) registrats, en ordre d'alta. """
+        return ((str(file_uuid), file) for file_uuid, file in self.__file_uuid_map.items())
+
+    def add_items(self, parells):
+        """ Registra parells (UUID en text, fitxer) ja calculats, p.ex. en carregar una instantània. """
+        for id_uuid, file in parells:
+            self.__file_uuid_map[uuid.UUID(id_uuid)] = file
+            self.__path_uuid_map[file] = id_uuid
 
     def remove_uuid(self, id_uuid: str):
         """ Elimina un UUID del sistema. """
@@ -36,7 +88,8 @@ class VideoID:
             return
         # Verificar si el UUID existeix directament
         if file_uuid in self.__file_uuid_map:
-            del self.__file_uuid_map[file_uuid]
+            file = self.__file_uuid_map.pop(file_uuid)
+            self.__path_uuid_map.pop(file, None)
 
     def __len__(self):
         """ Retorna el nombre d'UUIDs registrats. """
@@ -45,11 +98,11 @@ class VideoID:
     def __str__(self):
         """ Representació en cadena de VideoID. """
         return f"VideoID managing {len(self)} UUIDs"
-    
+
     def __iter__(self):
         """ Permet iterar sobre els UUIDs registrats. """
         return iter(self.__file_uuid_map.keys())
-        
+
     def __repr__(self):
         """ Representació en cadena de VideoID. """
         return str(self.__file_uuid_map)
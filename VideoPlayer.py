@@ -1,8 +1,7 @@
 import cfg
-from tinytag import TinyTag
-import vlc
 import time
 from VideoData import VideoData
+from PlayerBackend import PlayerBackend, VlcListBackend
 import os
 
 
@@ -12,19 +11,36 @@ class VideoPlayer:
     Utiliza VideoData para obtener la información necesaria.
     """
 
-    __slots__ = ['__video_data']
+    __slots__ = ['__video_data', '__backend', '__precarregat']
 
-    def __init__(self, video_data=None):
+    def __init__(self, video_data=None, backend=None):
         # Verificar si el argumento es válido y lanzar NotImplementedError si no lo es
         if video_data is None or not isinstance(video_data, VideoData):
             raise NotImplementedError("Se requiere una instancia válida de VideoData para instanciar VideoPlayer.")
+        if backend is not None and not isinstance(backend, PlayerBackend):
+            raise NotImplementedError("Se requiere una instancia válida de PlayerBackend.")
         self.__video_data = video_data
-    def play_video(self, uuid: str, mode: int):
+        self.__backend = backend
+        self.__precarregat = None  # (ruta, handle) del siguiente video ya abierto
+
+    @property
+    def video_data(self):
+        return self.__video_data
+
+    @property
+    def backend(self):
+        """Motor de reproducción; por defecto un VlcListBackend creado en el primer uso."""
+        if self.__backend is None:
+            self.__backend = VlcListBackend()
+        return self.__backend
+
+    def play_video(self, uuid: str, mode: int, next_uuid=None):
         """
         Reproduce un video en base al modo especificado:
         - mode 0: Imprime los metadatos y reproduce el video.
         - mode 1: Solo imprime los metadatos.
         - mode 2: Solo reproduce el video.
+        Con next_uuid, el siguiente video se prepara mientras suena este.
         """
         file_path = self.get_file_path(uuid)
         if not file_path:
@@ -35,7 +51,58 @@ class VideoPlayer:
             self.print_video(uuid)
 
         if mode > 0:
-            self.play_file(file_path)
+            # La duración ya está en el catálogo: no hace falta volver a leer el fichero
+            duration = self.__video_data.get_duration(uuid)
+            next_path = None
+            if next_uuid is not None and self.__video_data.existeix_uuid(next_uuid):
+                next_path = self.__video_data.get_path(next_uuid)
+            self.__reproduce(file_path, duration if duration is not None and duration >= 0 else None, next_path)
+
+    def __reproduce(self, file, duration, next_file=None):
+        """
+        Reproduce file con el motor (bloqueante) y abre next_file mientras
+        tanto. El handle abierto de next_file se guarda y se reutiliza en la
+        siguiente llamada; si esa llamada es de otro fichero, se libera.
+        """
+        if not os.path.exists(file):
+            print(f"Error: El archivo {file} no existe.")
+            return
+        backend = self.backend
+        handle = self.__handle_precarregat(file)
+        if handle is None:
+            handle = backend.open(file)
+        inici = time.perf_counter()
+        backend.play(handle)
+        if next_file is not None and os.path.exists(next_file):
+            # Fuera del try de la reproducción: si falla, el video actual sigue sonando
+            try:
+                self.__precarregat = (next_file, backend.open(next_file))
+            except Exception as e:
+                print(f"Error al abrir el siguiente video: {e}")
+        try:
+            if duration is None:
+                duration = backend.duration(handle) or 0
+            print(f"Reproduciendo: {file} ({duration} segundos)")
+            time.sleep(max(0, duration - (time.perf_counter() - inici)))
+        except Exception as e:
+            print(f"Error al reproducir: {e}")
+        finally:
+            backend.stop(handle)
+
+    def __handle_precarregat(self, file):
+        """El handle ya abierto de file, o None; si había otro preparado se libera."""
+        precarregat, self.__precarregat = self.__precarregat, None
+        if precarregat is None:
+            return None
+        ruta, handle = precarregat
+        if ruta == file:
+            return handle
+        self.backend.stop(handle)
+        return None
+
+    def release_prefetched(self):
+        """Libera el siguiente video preparado si ya no se va a reproducir."""
+        self.__handle_precarregat(None)
 
     def get_file_path(self, uuid: str):
         """Obtiene la ruta del archivo para un UUID."""
@@ -65,18 +132,26 @@ class VideoPlayer:
             print(f"{attr}: {value}")
 
     @staticmethod
-    def play_file(file: str):
-        """Reproduce un archivo MP4 usando VLC."""
+    def play_file(file: str, duration=None):
+        """
+        Reproduce un archivo MP4 usando VLC. Sin duration (en segundos) se
+        calcula con tinytag. Bloquea el hilo: para no bloquear, PlaybackScheduler.
+        """
         if not os.path.exists(file):
             print(f"Error: El archivo {file} no existe.")
             return
 
+        # vlc y tinytag solo se cargan al reproducir: el resto funciona sin libvlc
+        import vlc
+
         player = vlc.MediaPlayer(file)
         player.play()
 
         try:
-            tag = TinyTag.get(file)
-            duration = int(tag.duration) if tag.duration else 0
+            if duration is None:
+                from tinytag import TinyTag
+                tag = TinyTag.get(file)
+                duration = int(tag.duration) if tag.duration else 0
             print(f"Reproduciendo: {file} ({duration} segundos)")
             time.sleep(duration)
         except Exception as e:
@@ -90,8 +165,10 @@ class VideoPlayer:
             print("No hay videos para reproducir.")
             return
 
-        for uuid in self.__video_data.metadata.keys():
-            self.play_video(uuid, 0)
+        uuids = list(self.__video_data.metadata.keys())
+        for uuid, next_uuid in zip(uuids, uuids[1:] + [None]):
+            self.play_video(uuid, 0, next_uuid)
+        self.release_prefetched()  # por si el último no se pudo reproducir
     
     def __repr__(self):
         """Representación en cadena de VideoPlayer."""
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+VideoWatcher.py : Mode vigilància que manté VideoID i VideoData al dia.
+
+La biblioteca estàndard no ofereix inotify, així que es fa polling amb
+VideoFiles.reload_fs (que ja és incremental) amb un interval adaptatiu:
+torna a l'interval mínim quan hi ha canvis i es va doblant mentre no n'hi
+ha. Els esdeveniments es generen com a parells (tipus, fitxer) i s'apliquen
+en micro-lots amb les API en bloc de VideoID i VideoData.
+"""
+import threading
+import cfg
+from VideoFiles import VideoFiles
+from VideoID import VideoID
+from VideoData import VideoData
+
+AFEGIT = "add"
+ESBORRAT = "remove"
+MODIFICAT = "modify"
+
+
+class VideoWatcher:
+    __slots__ = ['__video_files', '__video_id', '__video_data', '__root', '__interval_min',
+                 '__interval_max', '__interval', '__check_modified', '__workers', '__atura']
+
+    def __init__(self, video_files, video_id, video_data, root=None, interval_min=0.5,
+                 interval_max=30.0, check_modified=True, workers=8):
+        if not isinstance(video_files, VideoFiles):
+            raise NotImplementedError("Se requiere una instancia válida de VideoFiles.")
+        if not isinstance(video_id, VideoID):
+            raise NotImplementedError("Se requiere una instancia válida de VideoID.")
+        if not isinstance(video_data, VideoData):
+            raise NotImplementedError("Se requiere una instancia válida de VideoData.")
+        self.__video_files = video_files
+        self.__video_id = video_id
+        self.__video_data = video_data
+        self.__root = root
+        self.__interval_min = interval_min
+        self.__interval_max = interval_max
+        self.__interval = interval_min
+        self.__check_modified = check_modified
+        self.__workers = workers
+        self.__atura = threading.Event()
+
+    def poll(self):
+        """ Un escaneig: retorna la llista d'esdeveniments (tipus, fitxer) des de l'anterior. """
+        root = self.__root if self.__root is not None else cfg.get_root()
+        video_files = self.__video_files
+        video_files.reload_fs(root, workers=self.__workers, check_modified=self.__check_modified)
+        return ([(ESBORRAT, fitxer) for fitxer in video_files.files_removed()]
+                + [(AFEGIT, fitxer) for fitxer in video_files.files_added()]
+                + [(MODIFICAT, fitxer) for fitxer in video_files.files_modified()])
+
+    def events(self):
+        """ Generador infinit d'esdeveniments fins que es crida stop(). """
+        while not self.__atura.is_set():
+            esdeveniments = self.poll()
+            yield from esdeveniments
+            self.__espera(bool(esdeveniments))
+
+    def __espera(self, hi_ha_canvis):
+        if hi_ha_canvis:
+            self.__interval = self.__interval_min
+        else:
+            self.__interval = min(self.__interval * 2, self.__interval_max)
+        self.__atura.wait(self.__interval)
+
+    def apply(self, esdeveniments):
+        """
+        Aplica un micro-lot d'esdeveniments. Per a cada fitxer només compta
+        l'últim; les altes passen per generate_uuids/add_videos i les altes i
+        modificacions es llegeixen amb load_metadata_bulk. Retorna un resum.
+        """
+        darrer = {}
+        for tipus, fitxer in esdeveniments:
+            darrer[fitxer] = tipus
+        esborrats = [fitxer for fitxer, tipus in darrer.items() if tipus == ESBORRAT]
+        altres = [fitxer for fitxer, tipus in darrer.items() if tipus != ESBORRAT]
+
+        video_id, video_data = self.__video_id, self.__video_data
+        uuids_esborrats = [uuid for uuid in video_id.get_uuids(esborrats) if uuid is not None]
+        video_data.remove_videos(uuids_esborrats)
+        for uuid in uuids_esborrats:
+            video_id.remove_uuid(uuid)
+
+        # Una alta d'un fitxer ja conegut (o una modificació d'un de desconegut) es resol aquí
+        coneguts = video_id.get_uuids(altres)
+        nous = [fitxer for fitxer, uuid in zip(altres, coneguts) if uuid is None]
+        modificats = [uuid for uuid in coneguts if uuid is not None]
+        parells = [(uuid, fitxer) for uuid, fitxer in zip(video_id.generate_uuids(nous), nous) if uuid is not None]
+        afegits = video_data.add_videos(parells)
+
+        errors = video_data.load_metadata_bulk(afegits + modificats, workers=self.__workers)
+        return {
+            "added": len(afegits),
+            "removed": len(uuids_esborrats),
+            "modified": len(modificats),
+            "errors": errors,
+        }
+
+    def watch(self, max_lot=1000):
+        """
+        Bucle de vigilància: a cada escaneig aplica els canvis en micro-lots
+        de com a molt max_lot esdeveniments i genera el resum de cada lot.
+        """
+        while not self.__atura.is_set():
+            esdeveniments = self.poll()
+            for i in range(0, len(esdeveniments), max_lot):
+                yield self.apply(esdeveniments[i:i + max_lot])
+            self.__espera(bool(esdeveniments))
+
+    def stop(self):
+        """ Atura events()/watch() a la propera iteració (es pot cridar des d'un altre fil). """
+        self.__atura.set()
+
+    @property
+    def interval(self):
+        """ Interval de polling actual en segons. """
+        return self.__interval
+
+    def __repr__(self):
+        return f"VideoWatcher(root={self.__root!r}, interval={self.__interval}s)"
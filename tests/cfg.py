@@ -0,0 +1,6 @@
+# Configuració de les proves: l'arrel de vídeos es pot canviar amb ROOT
+import os
+
+
+def get_root():
+    return os.environ.get("ROOT", os.path.join(os.path.dirname(os.path.abspath(__file__)), "videos"))
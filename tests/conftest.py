@@ -0,0 +1,27 @@
+import os
+import sys
+import pytest
+
+# Els mòduls viuen a l'arrel del repositori, no en un paquet
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def tags_sintetics():
+    """ tinytag substituït pel generador de tags deterministes de Benchmark. """
+    from Benchmark import tinytag_sintetic
+    with tinytag_sintetic():
+        yield
+
+
+@pytest.fixture
+def arrel(tmp_path, monkeypatch):
+    """ Arrel de vídeos temporal (cfg.get_root) amb fitxers buits a dins. """
+    monkeypatch.setenv("ROOT", str(tmp_path))
+
+    def crea(*noms):
+        for nom in noms:
+            (tmp_path / nom).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / nom).write_bytes(b"\0" * 16)
+        return tmp_path
+    return crea
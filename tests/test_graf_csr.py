@@ -0,0 +1,66 @@
+import random
+import pytest
+from ElementData import ElementData
+from GrafHash import GrafHash
+
+
+def graf_aleatori(digraf, n=60, m=240, llavor=0):
+    rnd = random.Random(llavor)
+    graf = GrafHash(digraf=digraf)
+    for i in range(n):
+        graf.insert_vertex(f"v{i}", ElementData(filename=f"v{i}.mp4"))
+    for _ in range(m):
+        graf.insert_edge(f"v{rnd.randrange(n)}", f"v{rnd.randrange(n)}", rnd.randint(1, 9))
+    del graf["v3"]  # un forat: els ids densos no coincideixen amb els noms
+    return graf
+
+
+def salts_bfs(graf, origen, invers=False):
+    """ Salts de la BFS sobre els dicts de GrafHash. """
+    veins = graf.edges_in if invers else graf.edges_out
+    salts = {origen: 0}
+    frontera = [origen]
+    while frontera:
+        seguent = []
+        for node in frontera:
+            for vei in veins(node):
+                if vei not in salts:
+                    salts[vei] = salts[node] + 1
+                    seguent.append(vei)
+        frontera = seguent
+    return salts
+
+
+@pytest.mark.parametrize("digraf", [False, True])
+def test_csr_igual_que_grafhash(digraf):
+    graf = graf_aleatori(digraf)
+    csr = graf.freeze()
+    assert list(csr) == list(graf.itera())
+    assert csr.es_digraf() == digraf
+    for key in csr:
+        for invers in (False, True):
+            ids, pesos = csr.veins(key, invers)
+            esperat = graf.edges_inv(key) if invers else ((vei, graf.get_weight(key, vei)) for vei in graf.edges_out(key))
+            assert dict(zip(csr.claus(ids), pesos.tolist())) == dict(esperat)
+    claus = list(csr)
+    assert dict(zip(claus, csr.grau_pes_out().tolist())) == {key: graf.grauPesOut(key) for key in claus}
+    assert dict(zip(claus, csr.grau_pes_in().tolist())) == {key: graf.grauPesIn(key) for key in claus}
+    for origen in claus[:10]:
+        for invers in (False, True):
+            nivells = csr.bfs(origen, invers)
+            assert {csr.clau(i): int(s) for i, s in enumerate(nivells.tolist()) if s >= 0} == \
+                salts_bfs(graf, origen, invers)
+        assert {csr.clau(i): int(s) for i, s in enumerate(csr.bfs(origen, max_salts=1).tolist()) if s >= 0} == \
+            {key: s for key, s in salts_bfs(graf, origen).items() if s <= 1}
+
+
+@pytest.mark.parametrize("digraf", [False, True])
+def test_from_csr_reconstrueix_el_graf(digraf):
+    graf = graf_aleatori(digraf)
+    csr = graf.freeze()
+    copia = GrafHash.from_csr(csr, (graf.get(key) for key in csr))
+    for key in csr:
+        assert sorted(copia.edges(key)) == sorted(graf.edges(key))
+        assert copia.rank(key) == graf.rank(key)
+        assert copia.distancies(key) == graf.distancies(key)
+    assert copia.top_rank(10) == graf.top_rank(10)
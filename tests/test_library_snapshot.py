@@ -0,0 +1,71 @@
+import random
+import pytest
+from LibrarySnapshot import load_snapshot, save_snapshot
+from VideoData import VideoData
+from VideoID import VideoID
+
+
+@pytest.fixture
+def biblioteca(tags_sintetics):
+    rnd = random.Random(1)
+    video_id = VideoID()
+    video_data = VideoData()
+    fitxers = [f"d{i % 7}/v{i}.mp4" for i in range(300)]
+    uuids = video_id.generate_uuids(fitxers)
+    video_data.add_videos(zip(uuids, fitxers))
+    video_data.load_metadata_bulk(uuids[:250], workers=2)
+    video_data.set_hints({uuids[260]: (42, "Pista del M3U")})
+    video_data.read_playlists([rnd.sample(uuids, 15) for _ in range(60)])
+    video_data.remove_videos(uuids[10:20])
+    for uuid in uuids[10:20]:
+        video_id.remove_uuid(uuid)
+    return video_id, video_data, uuids
+
+
+def test_anada_i_tornada(biblioteca, tmp_path):
+    video_id, video_data, uuids = biblioteca
+    path = str(tmp_path / "biblioteca.snap")
+    save_snapshot(path, video_id, video_data)
+    video_id2, video_data2 = load_snapshot(path)
+
+    assert list(video_id2.items()) == list(video_id.items())
+    assert dict(video_data2.metadata) == dict(video_data.metadata)
+    assert list(video_data2) == list(video_data)
+    for uuid in video_data:
+        assert sorted(video_data2.get_next_videos(uuid)) == sorted(video_data.get_next_videos(uuid))
+        assert video_data2.get_video_rank(uuid) == video_data.get_video_rank(uuid)
+    assert video_data2.get_top_videos(20) == video_data.get_top_videos(20)
+    assert video_data2.get_video_distance(uuids[0], uuids[50]) == video_data.get_video_distance(uuids[0], uuids[50])
+    for camp in ("title", "artist", "album", "genre"):
+        for sub in ("ro", "Artista 1", "àlbum", ""):
+            assert video_data2.search_text(camp, sub) == video_data.search_text(camp, sub)
+    assert video_data2.search_duration(10, 100) == video_data.search_duration(10, 100)
+
+
+def test_es_pot_modificar_despres_de_carregar(biblioteca, tmp_path):
+    video_id, video_data, uuids = biblioteca
+    path = str(tmp_path / "biblioteca.snap")
+    save_snapshot(path, video_id, video_data)
+    video_id2, video_data2 = load_snapshot(path)
+
+    # La pista del M3U segueix sense marcar com a llegida i no la trepitja una altra
+    assert video_data2.set_hints({uuids[260]: (50, "Una altra")}) == [uuids[260]]
+    assert video_data2.set_hints({uuids[0]: (50, "Una altra")}) == []
+
+    # Els mateixos canvis a l'original i a la còpia carregada donen el mateix resultat
+    for vid, vd in ((video_id, video_data), (video_id2, video_data2)):
+        nou = vid.generate_uuids(["nou.mp4"])
+        vd.add_videos(zip(nou, ["nou.mp4"]))
+        vd.load_metadata(nou[0])
+        assert nou[0] in vd.search_text("title", vd.get_title(nou[0]))
+        vd.read_playlists([[nou[0], uuids[0]]])
+    assert video_data2.get_video_rank(nou[0]) == video_data.get_video_rank(nou[0]) > 0
+    assert video_data2.get_top_videos(20) == video_data.get_top_videos(20)
+    assert list(video_data2) == list(video_data)
+
+
+def test_rebutja_fitxers_que_no_son_instantanies(tmp_path):
+    path = tmp_path / "no.snap"
+    path.write_bytes(b"no es una instantania" * 4)
+    with pytest.raises(ValueError):
+        load_snapshot(str(path))
@@ -0,0 +1,44 @@
+from MetadataCache import MetadataCache
+from VideoData import VideoData
+
+
+def test_load_metadata_desa_a_disc(arrel, tags_sintetics, tmp_path):
+    arrel("a.mp4", "b.mp4")
+    ruta = str(tmp_path / "cache.db")
+    cache = MetadataCache(ruta)
+    video_data = VideoData(cache)
+    video_data.add_video("u1", "a.mp4")
+    video_data.load_metadata("u1")
+    video_data.add_video("u2", "b.mp4")
+    video_data.load_metadata("u2")
+    assert len(MetadataCache(ruta)) == 0  # les càrregues soltes esperen el lot
+    video_data.flush_cache()
+    assert len(MetadataCache(ruta)) == 2
+    cache.close()
+
+
+def test_close_escriu_el_lot_pendent(arrel, tags_sintetics, tmp_path):
+    arrel("a.mp4")
+    ruta = str(tmp_path / "cache.db")
+    with MetadataCache(ruta) as cache:
+        video_data = VideoData(cache)
+        video_data.add_video("u1", "a.mp4")
+        video_data.load_metadata("u1")
+    assert len(MetadataCache(ruta)) == 1
+
+
+def test_la_cache_evita_rellegir(arrel, tags_sintetics, tmp_path):
+    arrel("a.mp4")
+    ruta = str(tmp_path / "cache.db")
+    with MetadataCache(ruta) as primera:
+        video_data = VideoData(primera)
+        video_data.add_video("u1", "a.mp4")
+        video_data.load_metadata("u1")
+        titol = video_data.get_title("u1")
+
+    cache = MetadataCache(ruta)
+    video_data = VideoData(cache)
+    video_data.add_video("u1", "a.mp4")
+    video_data.load_metadata("u1")
+    assert video_data.get_title("u1") == titol
+    assert cache.stats()["hits"] == 1
@@ -0,0 +1,61 @@
+import sys
+from ElementData import ElementData
+from GrafHash import GrafHash
+from MetadataStore import ElementRow, MetadataStore
+
+
+def tags(artista, album="Àlbum"):
+    return [60, "Títol", album, artista, "", "rock", "2001", ""]
+
+
+def internats(store):
+    return int(repr(store).split(", ")[1].split()[0])
+
+
+def test_element_row_es_una_vista_sense_els_slots_d_element_data():
+    store = MetadataStore()
+    store.add("u1", "a.mp4", "/v/a.mp4")
+    store.set_tags("u1", tags("Ana"))
+    fila = store.element("u1")
+    assert not isinstance(fila, ElementData)
+    assert not hasattr(fila, "__dict__")
+    assert ElementRow.__slots__ == ['__store', '__fila']
+    assert sys.getsizeof(fila) < sys.getsizeof(ElementData())
+    assert (fila.artist, fila.duration, fila.filename) == ("Ana", 60, "a.mp4")
+    assert fila == ElementData(filename="a.mp4")
+    graf = GrafHash()
+    graf.insert_vertex("u1", fila)
+    assert graf.get("u1").title == "Títol"
+
+
+def test_els_valors_internats_s_alliberen():
+    store = MetadataStore()
+    for i in range(10):
+        store.add(f"u{i}", f"{i}.mp4", f"/v/{i}.mp4")
+        store.set_tags(f"u{i}", tags(f"Artista {i}"))
+    assert internats(store) == 1 + 10 + 3  # "", artistes, àlbum, gènere i data
+    for i in range(10):
+        store.remove(f"u{i}")
+    assert internats(store) == 1
+    store.add("u0", "0.mp4", "/v/0.mp4")
+    store.set_tags("u0", tags("Nova"))
+    store.set_tags("u0", tags("Nova", album="Un altre"))
+    assert internats(store) == 1 + 4
+    assert store["u0"][5] == "Nova"
+    store.add("u0", "0.mp4", "/v/0.mp4")  # reiniciar la fila també allibera
+    assert internats(store) == 1
+
+
+def test_from_columns_amb_forats_a_la_taula():
+    store = MetadataStore()
+    for i in range(4):
+        store.add(f"u{i}", f"{i}.mp4", f"/v/{i}.mp4")
+        store.set_tags(f"u{i}", tags(f"Artista {i}"))
+    store.remove("u1")
+    uuids = ["u0", "u2", "u3"]
+    copia = MetadataStore.from_columns(uuids, store.columns(uuids))
+    assert {uuid: copia[uuid] for uuid in uuids} == {uuid: store[uuid] for uuid in uuids}
+    assert internats(copia) == internats(store)
+    copia.set_tags("u0", tags(None))  # None com a valor, no com a forat
+    assert copia["u0"][5] is None
+    assert copia["u2"][5] == "Artista 2"
@@ -0,0 +1,57 @@
+import pytest
+import Metrics
+from ElementData import ElementData
+from GrafHash import GrafHash
+
+
+@pytest.fixture
+def metrics():
+    Metrics.reset()
+    Metrics.enable()
+    yield Metrics
+    Metrics.disable()
+    Metrics.reset()
+
+
+def graf():
+    g = GrafHash(digraf=True)
+    for key in "abcd":
+        g.insert_vertex(key, ElementData(filename=key))
+    for key1, key2 in ("ab", "bc", "cd"):
+        g.insert_edge(key1, key2, 1)
+    return g
+
+
+def test_cada_nom_compta_nomes_les_seves_crides(metrics):
+    g = graf()
+    g.distancia("a", "c")
+    g.distancia("a", "d")
+    g.distancies_locals("a", max_salts=1)
+    g.distancies("a")
+    operacions = metrics.stats()["operacions"]
+    assert operacions["grafhash_distancia"]["crides"] == 2
+    assert operacions["grafhash_distancies_locals"]["crides"] == 1
+    assert operacions["grafhash_distancies"]["crides"] == 1
+    assert "grafhash_dijkstra" not in operacions
+
+
+def test_recorregut_compta_vertexs_i_arestes(metrics):
+    graf().distancies("a")
+    recorregut = metrics.stats()["operacions"]["grafhash_recorregut"]
+    assert recorregut["vertexs"] == 4
+    assert recorregut["arestes"] == 3
+
+
+def test_desactivat_no_registra_res():
+    Metrics.reset()
+    graf().distancia("a", "d")
+    assert Metrics.stats() == {"operacions": {}, "comptadors": {}}
+
+
+def test_prometheus(metrics, tmp_path):
+    graf().distancia("a", "d")
+    path = tmp_path / "m.prom"
+    metrics.dump_prometheus(str(path))
+    text = path.read_text(encoding="utf-8")
+    assert 'edvideo_operation_seconds_count{op="grafhash_distancia"} 1' in text
+    assert 'edvideo_vertices_visited_total{op="grafhash_recorregut"}' in text
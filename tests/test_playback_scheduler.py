@@ -0,0 +1,78 @@
+import asyncio
+from PlaybackScheduler import PlaybackScheduler
+from PlayerBackend import StubBackend
+from VideoData import VideoData
+
+ESCALA = 0.001  # 1 s de vídeo = 1 ms de prova
+
+
+def biblioteca(n=6, durada=20):
+    video_data = VideoData()
+    uuids = [f"u{i}" for i in range(n)]
+    video_data.add_videos((uuid, f"{uuid}.mp4") for uuid in uuids)
+    video_data.set_hints({uuid: (durada, None) for uuid in uuids})
+    return video_data, uuids
+
+
+def operacions(backend):
+    return [(op, path.rsplit("/", 1)[-1]) for _, op, path in backend.events]
+
+
+def test_reprodueix_en_ordre():
+    video_data, uuids = biblioteca()
+    backend = StubBackend()
+
+    async def prova():
+        scheduler = PlaybackScheduler(video_data, backend, escala=ESCALA)
+        scheduler.enqueue(uuids[:2])
+        scheduler.enqueue(uuids[2])
+        await scheduler.play()
+        return scheduler
+
+    scheduler = asyncio.run(prova())
+    assert scheduler.played == uuids[:3]
+    assert scheduler.current is None and scheduler.queue == []
+    assert [path for op, path in operacions(backend) if op == "play"] == ["u0.mp4", "u1.mp4", "u2.mp4"]
+
+
+def test_el_seguent_s_obre_mentre_es_reprodueix_l_actual():
+    video_data, uuids = biblioteca()
+    backend = StubBackend(open_delay=0.005)
+
+    async def prova():
+        scheduler = PlaybackScheduler(video_data, backend, escala=ESCALA)
+        scheduler.enqueue(uuids[:3])
+        await scheduler.play()
+
+    asyncio.run(prova())
+    ops = operacions(backend)
+    for actual, seguent in (("u0.mp4", "u1.mp4"), ("u1.mp4", "u2.mp4")):
+        # open del següent després de començar l'actual i abans d'aturar-lo
+        assert ops.index(("play", actual)) < ops.index(("open", seguent)) < ops.index(("stop", actual))
+    assert ops.count(("open", "u1.mp4")) == 1  # el precarregat no es torna a obrir
+
+
+def test_skip_stop_i_desconeguts():
+    video_data, uuids = biblioteca(durada=10 ** 6)  # prou llarg per no acabar sol
+    backend = StubBackend()
+
+    async def prova():
+        scheduler = PlaybackScheduler(video_data, backend, escala=ESCALA)
+        scheduler.enqueue([uuids[0], "desconegut", uuids[1], uuids[2], uuids[3]])
+        tasca = scheduler.play()
+        await asyncio.sleep(0.01)
+        assert scheduler.current == uuids[0]
+        scheduler.skip()
+        await asyncio.sleep(0.01)
+        assert scheduler.current == uuids[1]  # el desconegut se salta
+        scheduler.stop()
+        await tasca
+        return scheduler
+
+    scheduler = asyncio.run(prova())
+    assert scheduler.played == uuids[:2]
+    assert scheduler.queue == uuids[2:4]  # stop conserva la cua
+    ops = operacions(backend)
+    # El precarregat (u2) es descarta en aturar-se: cada open té el seu stop
+    assert sorted(p for op, p in ops if op == "open") == sorted(p for op, p in ops if op == "stop")
+    assert ("play", "u2.mp4") not in ops
@@ -0,0 +1,160 @@
+import sys
+import types
+import pytest
+from PlayerBackend import StubBackend, VlcListBackend
+
+
+class FakeMedia:
+    def __init__(self, path):
+        self.path = path
+        self.alliberat = False
+
+    def parse(self):
+        pass
+
+    def get_duration(self):
+        return 5000
+
+    def release(self):
+        assert not self.alliberat, "release() doble"
+        self.alliberat = True
+
+
+class FakeMediaList:
+    def __init__(self):
+        self.items = []
+
+    def lock(self):
+        pass
+
+    def unlock(self):
+        pass
+
+    def index_of_item(self, media):
+        return self.items.index(media) if media in self.items else -1
+
+    def add_media(self, media):
+        self.items.append(media)
+
+    def remove_index(self, index):
+        self.items.pop(index)
+
+    def release(self):
+        pass
+
+
+class FakeMediaListPlayer:
+    def set_media_list(self, llista):
+        self.llista = llista
+
+    def play_item(self, media):
+        assert not media.alliberat, "s'ha reproduït un Media alliberat"
+
+    def stop(self):
+        pass
+
+    def release(self):
+        pass
+
+
+class FakeInstance:
+    def __init__(self, *args):
+        pass
+
+    def media_new(self, path):
+        return FakeMedia(path)
+
+    def media_list_new(self):
+        return FakeMediaList()
+
+    def media_list_player_new(self):
+        return FakeMediaListPlayer()
+
+    def release(self):
+        pass
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    # libvlc no és necessari per provar la gestió del pool
+    monkeypatch.setitem(sys.modules, "vlc", types.SimpleNamespace(Instance=FakeInstance))
+    return VlcListBackend(pool=1)
+
+
+def test_expulsar_del_pool_no_allibera_handles_vius(backend):
+    a = backend.open("a.mp4")
+    b = backend.open("b.mp4")  # expulsa a del pool
+    assert not a.alliberat
+    backend.play(a)
+    backend.stop(a)
+    assert a.alliberat
+    backend.play(b)
+    backend.stop(b)
+    assert b.alliberat
+
+
+def test_precarregat_descartat_es_queda_al_pool(backend):
+    a = backend.open("a.mp4")
+    backend.stop(a)  # descartat sense reproduir
+    assert not a.alliberat
+    assert backend.open("a.mp4") is a  # es reutilitza
+    backend.stop(a)
+    backend.close()
+    assert a.alliberat
+
+
+def test_dos_opens_del_mateix_path(backend):
+    primer = backend.open("a.mp4")
+    segon = backend.open("a.mp4")
+    assert primer is segon
+    backend.play(primer)
+    backend.stop(primer)
+    assert not segon.alliberat
+    backend.stop(segon)
+    assert segon.alliberat
+
+
+def test_stub_nomes_paga_un_open():
+    stub = StubBackend(durades={"a.mp4": 3})
+    handle = stub.open("a.mp4")
+    stub.play(handle)
+    stub.stop(handle)
+    assert [op for _, op, _ in stub.events] == ["open", "play", "stop"]
+    assert stub.duration(handle) == 3
+
+
+def reproductor(backend, arrel, monkeypatch, n=4):
+    from VideoData import VideoData
+    from VideoPlayer import VideoPlayer
+    monkeypatch.setattr("VideoPlayer.time.sleep", lambda segons: None)
+    root = arrel(*(f"v{i}.mp4" for i in range(n)))
+    video_data = VideoData()
+    uuids = [f"u{i}" for i in range(n)]
+    video_data.add_videos((uuid, str(root / f"v{i}.mp4")) for i, uuid in enumerate(uuids))
+    video_data.set_hints({uuid: (1, None) for uuid in uuids})
+    return VideoPlayer(video_data, backend), uuids
+
+
+def test_el_seguent_preparat_es_reutilitza(backend, arrel, monkeypatch):
+    player, uuids = reproductor(backend, arrel, monkeypatch)
+    oberts = []
+    media_new = FakeInstance.media_new
+    monkeypatch.setattr(FakeInstance, "media_new", lambda self, path: oberts.append(path) or media_new(self, path))
+    for uuid, seguent in zip(uuids, uuids[1:] + [None]):
+        player.play_video(uuid, 2, seguent)
+    assert [path.rsplit("/", 1)[-1] for path in oberts] == ["v0.mp4", "v1.mp4", "v2.mp4", "v3.mp4"]
+    assert backend._VlcListBackend__refs == {}
+    assert backend._VlcListBackend__llista.items == []
+
+
+def test_el_seguent_no_reproduit_s_allibera(backend, arrel, monkeypatch):
+    player, uuids = reproductor(backend, arrel, monkeypatch)
+    player.play_video(uuids[0], 2, uuids[1])
+    preparat = backend.open(player.get_file_path(uuids[1]))
+    backend.stop(preparat)
+    player.play_video(uuids[2], 2)  # uuids[1] no s'arriba a reproduir
+    player.release_prefetched()
+    backend.close()
+    assert preparat.alliberat
+    assert backend._VlcListBackend__refs == {}
+    assert backend._VlcListBackend__llista.items == []
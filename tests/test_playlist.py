@@ -0,0 +1,89 @@
+import sys
+import types
+from PlayList import PlayList, llegeix_m3u, parteix_extinf
+from VideoData import VideoData
+from VideoID import VideoID
+from VideoPlayer import VideoPlayer
+
+M3U = """#EXTM3U
+#EXTINF:123.2,Song A
+v1.mp4
+#EXTINF:-1,
+v2.mp4
+
+v1.mp4
+# comentari
+v3.mp4
+http://exemple/stream
+#EXTINF:10 tvg-name="a,b",Amb coma
+nothere.mp4
+v4.mp4
+"""
+
+
+def biblioteca(n=6):
+    video_id = VideoID()
+    video_data = VideoData()
+    fitxers = [f"v{i}.mp4" for i in range(n)]
+    uuids = video_id.generate_uuids(fitxers)
+    video_data.add_videos(zip(uuids, fitxers))
+    return video_id, video_data, uuids
+
+
+def escriu(tmp_path, text=M3U):
+    path = tmp_path / "llista.m3u"
+    path.write_text(text)
+    return str(path)
+
+
+def test_parteix_extinf():
+    assert parteix_extinf('10 tvg="a,b",Títol, amb coma') == ('10 tvg="a,b"', "Títol, amb coma")
+    assert parteix_extinf("10") == ("10", "")
+
+
+def test_llegeix_m3u(tmp_path):
+    assert list(llegeix_m3u(escriu(tmp_path))) == [
+        ("v1.mp4", 124, "Song A"),
+        ("v2.mp4", None, None),
+        ("v1.mp4", None, None),
+        ("v3.mp4", None, None),
+        ("nothere.mp4", 10, "Amb coma"),
+        ("v4.mp4", None, None),
+    ]
+
+
+def test_load_file_i_pistes(tmp_path):
+    video_id, video_data, uuids = biblioteca()
+    playlist = PlayList(video_id, VideoPlayer(video_data))
+    m3u = escriu(tmp_path)
+    assert playlist.load_file(m3u) == [uuids[1], uuids[2], uuids[3], uuids[4]]
+    pistes = {}
+    assert list(playlist.iter_file(m3u, pistes)) == [uuids[1], uuids[2], uuids[3], uuids[4]]
+    assert video_data.set_hints(pistes) == [uuids[1]]
+    assert video_data.get_duration(uuids[1]) == 124
+    assert video_data.get_title(uuids[1]) == "Song A"
+    assert video_data.search_duration(100, 200) == [uuids[1]]
+
+
+def test_les_pistes_no_trepitgen_tags_llegits_sense_durada(monkeypatch):
+    tag = types.SimpleNamespace(duration=None, title="Títol real", album=None, artist=None,
+                                composer=None, genre=None, year=None, comment=None)
+    monkeypatch.setitem(sys.modules, "tinytag", types.SimpleNamespace(
+        TinyTag=types.SimpleNamespace(get=lambda path: tag)))
+    _, video_data, uuids = biblioteca()
+    video_data.load_metadata(uuids[0])
+    assert video_data.get_duration(uuids[0]) == -1
+    assert video_data.set_hints({uuids[0]: (60, "Títol del M3U")}) == []
+    assert video_data.get_title(uuids[0]) == "Títol real"
+
+
+def test_read_stream_equival_a_read_playlist(tmp_path):
+    video_id, video_data, uuids = biblioteca()
+    _, video_data2, _ = biblioteca()
+    playlist = PlayList(video_id, VideoPlayer(video_data))
+    m3u = escriu(tmp_path, "\n".join(f"v{i % 6}.mp4" for i in [0, 1, 2, 1, 3, 5, 0, 1]) + "\n")
+    playlist.load_file(m3u)
+    video_data.read_playlist(playlist)
+    assert video_data2.read_stream(playlist.iter_file(m3u), lot=2) == 4  # sense repetits: 0, 1, 2, 3, 5
+    for uuid in uuids:
+        assert sorted(video_data.get_next_videos(uuid)) == sorted(video_data2.get_next_videos(uuid))
@@ -0,0 +1,74 @@
+import random
+import pytest
+from NGramIndex import NGramIndex
+from SearchMetadata import SearchMetadata
+from VideoData import VideoData
+
+SUBCADENES = ["ro", "rock", "ROCK", "artista 1", "àlbum", "títol", "none", "1", "", "zzz", " 1", "jazz"]
+
+
+@pytest.fixture
+def video_data(tags_sintetics):
+    video_data = VideoData()
+    uuids = [f"u{i}" for i in range(400)]
+    for uuid in uuids:
+        video_data.add_video(uuid, uuid + ".mp4")
+    for uuid in uuids[:300]:
+        video_data.load_metadata(uuid)
+    video_data.remove_video("u5")
+    video_data.remove_videos(["u7", "u9"])
+    video_data.add_video("u7", "u7.mp4")  # torna a entrar: va al final
+    video_data.load_metadata("u7")
+    return video_data
+
+
+def escaneig(video_data, getter, sub):
+    """ La cerca lineal original de filter_by_attribute. """
+    return [uuid for uuid in video_data.metadata.keys()
+            if (value := getter(uuid)) and sub.lower() in str(value).lower()]
+
+
+def test_cerca_de_text_igual_que_l_escaneig(video_data):
+    cerca = SearchMetadata(video_data)
+    for sub in SUBCADENES:
+        for camp in ("title", "album", "artist", "composer", "genre", "comment"):
+            assert getattr(cerca, camp)(sub) == escaneig(video_data, getattr(video_data, "get_" + camp), sub)
+        assert cerca.date(sub) == escaneig(video_data, lambda uuid: str(video_data.get_date(uuid)), sub)
+
+
+def test_ngram_index_igual_que_in():
+    rnd = random.Random(0)
+    textos = {f"u{i}": "".join(rnd.choice("abcé ") for _ in range(rnd.randint(0, 12))) for i in range(300)}
+    index = NGramIndex()
+    for uuid, text in textos.items():
+        index.add(uuid, text)
+    for uuid in list(textos)[::3]:
+        index.remove(uuid)
+        del textos[uuid]
+    for sub in ["a", "ab", "abc", "é a", "cc b", "", "ABC", "zzz"]:
+        # Els textos buits no s'indexen, com el `value and` de l'escaneig
+        assert index.search(sub) == {uuid for uuid, text in textos.items() if text and sub.lower() in text.lower()}
+        assert index.estimate(sub) >= len(index.search(sub))
+
+
+def test_cerca_per_durada_en_ordre_d_insercio(video_data):
+    cerca = SearchMetadata(video_data)
+    for minim, maxim in [(0, 10 ** 6), (60, 300), (-1, -1), (200, 100)]:
+        esperat = [uuid for uuid in video_data.metadata.keys()
+                   if (durada := video_data.get_duration(uuid)) is not None and minim <= durada <= maxim]
+        assert cerca.duration(minim, maxim) == esperat
+        assert cerca.count_duration(minim, maxim) == len(esperat)
+
+
+def test_get_similar_approx_nomes_el_veinatge():
+    video_data = VideoData()
+    uuids = [f"u{i:02d}" for i in range(40)]
+    video_data.add_videos((uuid, uuid + ".mp4") for uuid in uuids)
+    video_data.read_stream(uuids[:6])  # cadena u00 -> u01 -> ... -> u05
+    cerca = SearchMetadata(video_data)
+    propers, _ = cerca.get_similar_approx("u00", 10, max_salts=2)
+    assert propers and set(propers) <= {"u01", "u02"}  # sense farciment de fora del radi
+    tots, _ = cerca.get_similar_approx("u00", 10, max_salts=len(uuids))
+    exacte = cerca.get_similar("u00", 10)
+    assert tots == exacte[:len(tots)] and set(tots) == set(uuids[1:6])
+    assert len(exacte) == 10
@@ -0,0 +1,47 @@
+import sys
+import types
+import pytest
+from VideoData import VideoData, llegeix_tags
+
+
+class TagSenseDurada:
+    duration = None
+    title = "Títol real"
+    album = artist = composer = genre = year = comment = None
+
+
+@pytest.fixture
+def sense_durada(monkeypatch):
+    tinytag = types.SimpleNamespace(TinyTag=types.SimpleNamespace(get=lambda path: TagSenseDurada()))
+    monkeypatch.setitem(sys.modules, "tinytag", tinytag)
+
+
+def test_llegeix_tags_sense_durada(sense_durada):
+    assert llegeix_tags("x.mp4")[:2] == [-1, "Títol real"]
+
+
+def test_load_metadata_sense_durada(arrel, sense_durada):
+    arrel("a.mp4")
+    video_data = VideoData()
+    video_data.add_video("u1", "a.mp4")
+    video_data.load_metadata("u1")
+    assert video_data.get_duration("u1") == -1
+    assert video_data.get_title("u1") == "Títol real"
+
+
+def test_add_videos_no_repeteix_uuids():
+    video_data = VideoData()
+    assert video_data.add_videos([("u1", "a.mp4"), ("u2", "b.mp4"), ("u1", "c.mp4"), ("u2", "b.mp4")]) == ["u1", "u2"]
+    assert len(video_data) == 2
+    assert video_data.get_filename("u1") == "c.mp4"  # com add_video: l'últim fitxer reinicia la fila
+    assert not video_data.existeix_file("a.mp4")
+    assert video_data.search_duration(-1, -1) == ["u1", "u2"]
+
+
+def test_remove_videos_amb_uuids_repetits():
+    video_data = VideoData()
+    video_data.add_videos([("u1", "a.mp4"), ("u2", "b.mp4"), ("u3", "c.mp4")])
+    video_data.remove_videos(["u1", "u3", "u1", "desconegut"])
+    assert len(video_data) == 1
+    assert not video_data.existeix_file("a.mp4") and not video_data.existeix_file("c.mp4")
+    assert video_data.search_duration(-1, -1) == ["u2"]
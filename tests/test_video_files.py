@@ -0,0 +1,70 @@
+import os
+import shutil
+import time
+import pytest
+from VideoFiles import VideoFiles
+
+FA_UNA_HORA = time.time() - 3600
+
+
+def crea(arrel, *noms):
+    for nom in noms:
+        path = arrel / nom
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"\0" * 16)
+
+
+def envelleix(arrel):
+    """ Directoris amb el mtime d'una hora enrere, fora de la finestra de GRANULARITAT_NS. """
+    for directori, _, _ in os.walk(arrel):
+        os.utime(directori, (FA_UNA_HORA, FA_UNA_HORA))
+
+
+def noms(arrel, fitxers):
+    return sorted(os.path.relpath(fitxer, arrel) for fitxer in fitxers)
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_reload_fs_delta(tmp_path, workers):
+    crea(tmp_path, "a.mp4", "x/b.mp4", "x/c.MP4", "x/notes.txt", "y/z/d.mp4", "w/e.mp4")
+    video_files = VideoFiles()
+    video_files.reload_fs(str(tmp_path), workers=workers)
+    assert noms(tmp_path, video_files.files_added()) == ["a.mp4", "w/e.mp4", "x/b.mp4", "x/c.MP4", "y/z/d.mp4"]
+    assert video_files.files_removed() == []
+    envelleix(tmp_path)
+
+    crea(tmp_path, "x/f.mp4", "y/z/nou/g.mp4")
+    os.remove(tmp_path / "x" / "b.mp4")
+    shutil.rmtree(tmp_path / "w")
+    video_files.reload_fs(str(tmp_path), workers=workers)
+    assert noms(tmp_path, video_files.files_added()) == ["x/f.mp4", "y/z/nou/g.mp4"]
+    assert noms(tmp_path, video_files.files_removed()) == ["w/e.mp4", "x/b.mp4"]
+    assert len(video_files) == 5
+
+    video_files.reload_fs(str(tmp_path), workers=workers)
+    assert video_files.files_added() == [] and video_files.files_removed() == []
+    assert noms(tmp_path, video_files) == ["a.mp4", "x/c.MP4", "x/f.mp4", "y/z/d.mp4", "y/z/nou/g.mp4"]
+
+
+def test_no_reaprofita_un_llistat_recent(tmp_path):
+    crea(tmp_path, "x/a.mp4")
+    video_files = VideoFiles()
+    video_files.reload_fs(str(tmp_path), workers=1)
+    # Un canvi que no mou el mtime del directori, com passa amb una resolució grollera
+    mtime = os.stat(tmp_path / "x").st_mtime_ns
+    crea(tmp_path, "x/b.mp4")
+    os.utime(tmp_path / "x", ns=(mtime, mtime))
+    video_files.reload_fs(str(tmp_path), workers=1)
+    assert noms(tmp_path, video_files.files_added()) == ["x/b.mp4"]
+
+
+def test_reaprofita_els_directoris_sense_canvis(tmp_path):
+    crea(tmp_path, "x/a.mp4")
+    envelleix(tmp_path)
+    video_files = VideoFiles()
+    video_files.reload_fs(str(tmp_path), workers=1)
+    # Mateix mtime i fora de la finestra: es confia en el llistat anterior
+    crea(tmp_path, "x/b.mp4")
+    os.utime(tmp_path / "x", (FA_UNA_HORA, FA_UNA_HORA))
+    video_files.reload_fs(str(tmp_path), workers=1)
+    assert video_files.files_added() == []
@@ -0,0 +1,68 @@
+import os
+from VideoData import VideoData
+from VideoFiles import VideoFiles
+from VideoID import VideoID
+from VideoWatcher import VideoWatcher, AFEGIT, ESBORRAT, MODIFICAT
+
+
+def crea(arrel, *noms, mida=16):
+    for nom in noms:
+        path = arrel / nom
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"\0" * mida)
+
+
+def vigilant(arrel):
+    video_id, video_data = VideoID(), VideoData()
+    watcher = VideoWatcher(VideoFiles(), video_id, video_data, root=str(arrel), interval_min=0.001,
+                           interval_max=0.002, workers=2)
+    return watcher, video_id, video_data
+
+
+def titols(video_data):
+    return sorted(video_data.get_title(uuid) for uuid in video_data.metadata.keys())
+
+
+def test_apply_afegeix_modifica_i_esborra(tmp_path, tags_sintetics):
+    crea(tmp_path, "a.mp4", "b.mp4", "sub/c.mp4")
+    watcher, video_id, video_data = vigilant(tmp_path)
+    assert watcher.apply(watcher.poll()) == {"added": 3, "removed": 0, "modified": 0, "errors": {}}
+    assert len(video_id) == len(video_data) == 3
+    assert titols(video_data) == ["Títol a.mp4", "Títol b.mp4", "Títol c.mp4"]
+
+    crea(tmp_path, "d.mp4")
+    crea(tmp_path, "b.mp4", mida=32)  # canvia la mida: modificat
+    os.remove(tmp_path / "sub" / "c.mp4")
+    esdeveniments = watcher.poll()
+    assert sorted((tipus, os.path.basename(fitxer)) for tipus, fitxer in esdeveniments) == [
+        (AFEGIT, "d.mp4"), (MODIFICAT, "b.mp4"), (ESBORRAT, "c.mp4")]
+    uuid_b = video_id.get_uuid(str(tmp_path / "b.mp4"))
+    assert watcher.apply(esdeveniments) == {"added": 1, "removed": 1, "modified": 1, "errors": {}}
+    assert len(video_id) == len(video_data) == 3
+    assert titols(video_data) == ["Títol a.mp4", "Títol b.mp4", "Títol d.mp4"]
+    assert video_id.get_uuid(str(tmp_path / "b.mp4")) == uuid_b  # mateix vídeo, mateix uuid
+    assert video_id.get_uuid(str(tmp_path / "sub" / "c.mp4")) is None
+
+
+def test_apply_es_queda_amb_l_ultim_esdeveniment(tmp_path, tags_sintetics):
+    crea(tmp_path, "a.mp4")
+    watcher, video_id, video_data = vigilant(tmp_path)
+    fitxer = str(tmp_path / "a.mp4")
+    assert watcher.apply([(AFEGIT, fitxer), (ESBORRAT, fitxer)])["added"] == 0
+    assert watcher.apply([(ESBORRAT, fitxer), (AFEGIT, fitxer)])["added"] == 1
+    assert len(video_id) == len(video_data) == 1
+
+
+def test_watch_genera_un_resum_per_lot(tmp_path, tags_sintetics):
+    crea(tmp_path, *(f"v{i}.mp4" for i in range(5)))
+    watcher, video_id, video_data = vigilant(tmp_path)
+    resums = watcher.watch(max_lot=2)
+    assert [next(resums)["added"] for _ in range(3)] == [2, 2, 1]
+    assert len(video_data) == 5
+
+    os.remove(tmp_path / "v0.mp4")
+    resum = next(resums)  # els escaneigs sense canvis no generen resum
+    assert resum == {"added": 0, "removed": 1, "modified": 0, "errors": {}}
+    watcher.stop()
+    assert list(resums) == []
+    assert len(video_id) == len(video_data) == 4